@@ -0,0 +1,170 @@
+"""Local stand-in for the bitstream emulator and injector HTTP APIs, for running and benchmarking the test harness without a cluster.
+
+Requests for an emulator can be routed either by host name (fhs-vcc-emulator-<N>.<anything>), as in the cluster,
+or by path prefix (/fhs-vcc-emulator-<N>/...), which needs no DNS. For the latter, point the tests at the server with e.g.
+    --emulator_base_url "localhost:5001/{emulator_id}" --inject_url "http://localhost:5001/inject"
+
+Usage:
+    python -m local_emulator.server [--host 127.0.0.1] [--port 5001] [--latency ROUTE=SEC ...] [--transition-delay SEC] [--block-transition-delay IP_BLOCK/ROUTE=SEC ...]
+"""
+
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from local_emulator.simulator import EmulatorSimulator, InvalidTransition
+
+EMULATOR_ID_PATTERN = re.compile(r"^fhs-vcc-emulator-\d+$")
+
+
+class LocalEmulatorServer:
+    """HTTP server implementing the emulator routes used by EmulatorAPIService and the /inject route used by InjectorAPIService,
+    backed by an EmulatorSimulator, with a configurable latency per route (keyed by route name, e.g. "state" or "inject";
+    "*" applies to all other routes).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        route_latency_sec: dict[str, float] | None = None,
+        transition_delay_sec: float = 0.0,
+        simulator: EmulatorSimulator | None = None,
+    ):
+        self.route_latency_sec = route_latency_sec or {}
+        self.simulator = simulator or EmulatorSimulator(transition_delay_sec)
+        self.logger = logging.getLogger(__name__)
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        """host:port the server is listening on."""
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "LocalEmulatorServer":
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="local-emulator", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Local emulator listening on {self.address}")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "LocalEmulatorServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def handle(self, method: str, host: str, path: str, body: Any) -> tuple[int, Any]:
+        """
+        Handle a request.
+
+        :returns: Status code and JSON response body
+        """
+        segments = [segment for segment in path.split("?")[0].split("/") if segment]
+
+        if segments == ["inject"]:
+            self._simulate_latency("inject")
+            if method != "POST":
+                return 405, {"error": "inject only supports POST"}
+            self.simulator.inject(body["injector_event_groups"])
+            return 200, {"status": "ok"}
+
+        host_label = host.split(".")[0].split(":")[0]
+        if segments and EMULATOR_ID_PATTERN.match(segments[0]):
+            emulator_id, segments = segments[0], segments[1:]
+        elif EMULATOR_ID_PATTERN.match(host_label):
+            emulator_id = host_label
+        else:
+            return 404, {"error": f"no emulator for host {host} and path {path}"}
+
+        if not segments:
+            return 404, {"error": "no route given"}
+        ip_block, route = (segments[0], segments[1]) if len(segments) >= 2 else (None, segments[0])
+        self._simulate_latency(route)
+
+        if route == "state":
+            return 200, {"current_state": self.simulator.get_state(emulator_id, ip_block)}
+        if route == "status" and ip_block is not None:
+            return 200, self.simulator.get_status(emulator_id, ip_block)
+        if method != "POST":
+            return 404, {"error": f"unknown route {route}"}
+        try:
+            return 200, self.simulator.request(emulator_id, ip_block, route, body)
+        except InvalidTransition as e:
+            return 409, {"error": str(e)}
+
+    def _simulate_latency(self, route: str) -> None:
+        latency_sec = self.route_latency_sec.get(route, self.route_latency_sec.get("*", 0.0))
+        if latency_sec > 0:
+            time.sleep(latency_sec)
+
+
+def _make_handler(server: LocalEmulatorServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep connections alive, like the real services, so the harness's connection pooling is exercised
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_POST(self):
+            self._respond("POST")
+
+        def _respond(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, response = server.handle(method, self.headers.get("Host", ""), self.path, body)
+            except (ValueError, KeyError, TypeError) as e:
+                status, response = 400, {"error": str(e)}
+            content = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            server.logger.debug(format % args)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--latency", action="append", default=[], metavar="ROUTE=SEC", help="Latency to add to a route (* for all routes)")
+    parser.add_argument("--transition-delay", type=float, default=0.0, help="Seconds before a state change requested by a route takes effect")
+    parser.add_argument("--block-transition-delay", action="append", default=[], metavar="IP_BLOCK/ROUTE=SEC", help="Transition delay for one route of one kind of IP block")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    route_latency_sec = {route: float(sec) for route, _, sec in (latency.partition("=") for latency in args.latency)}
+    transition_delays_sec = {tuple(key.split("/", 1)): float(sec) for key, _, sec in (delay.partition("=") for delay in args.block_transition_delay)}
+    server = LocalEmulatorServer(args.host, args.port, route_latency_sec, simulator=EmulatorSimulator(args.transition_delay, transition_delays_sec))
+    server.logger.info(f"Local emulator listening on {server.address}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Deterministic simulator of the IP block state machines of any number of bitstream emulators"""
+
+import threading
+import time
+from typing import Any, Callable, NamedTuple
+
+RESET_ROUTES = ("recover",)
+
+
+class IPBlockModel(NamedTuple):
+    """State machine of one kind of IP block."""
+
+    initial_state: str
+    transitions: dict[str, dict[str, str]]
+    """Target state for each route, keyed by route and then by source state ("*" for any source state)."""
+    status_flags: Callable[[dict[str, Any]], dict[str, bool]] | None = None
+    """Derives status flags from the block's registers."""
+
+
+def _wib_status_flags(registers: dict[str, Any]) -> dict[str, bool]:
+    # The WIB flags packets whose metadata doesn't match what it was configured to expect
+    return {
+        "dish_id_mismatch": "expected_dish_id" in registers and registers.get("meta_dish_id") != registers["expected_dish_id"],
+        "sample_rate_mismatch": "expected_sample_rate" in registers and registers.get("rx_sample_rate") != registers["expected_sample_rate"],
+    }
+
+
+_SIGNAL_PROCESSING_MODEL = IPBlockModel(
+    "RESET",
+    {
+        "configure": {"*": "ACTIVE"},
+        "deconfigure": {"*": "RESET"},
+    },
+)
+
+IP_BLOCK_MODELS = {
+    "ethernet_200g": IPBlockModel(
+        "RESET",
+        {
+            "start": {"RESET": "LINK"},
+            "stop": {"LINK": "RESET"},
+        },
+    ),
+    "packet_validation": IPBlockModel(
+        "RESET",
+        {
+            "start": {"RESET": "ENABLED"},
+            "stop": {"ENABLED": "RESET"},
+        },
+    ),
+    "wideband_input_buffer": IPBlockModel(
+        "RESET",
+        {
+            "configure": {"RESET": "READY", "READY": "READY"},
+            "start": {"READY": "ENABLED"},
+            "stop": {"ENABLED": "READY"},
+            "deconfigure": {"READY": "RESET"},
+        },
+        _wib_status_flags,
+    ),
+    "b123vcc": _SIGNAL_PROCESSING_MODEL,
+    "wideband_frequency_shifter": _SIGNAL_PROCESSING_MODEL,
+    "fs_selection_26_2_1": _SIGNAL_PROCESSING_MODEL,
+}
+"""Models of the IP blocks the tests check the state of. Any other IP block uses the generic signal processing model.
+Every block also goes back to its initial state on recover."""
+
+
+class InvalidTransition(Exception):
+    """A route was requested in a state which doesn't allow it."""
+
+
+class SimulatedIPBlock:
+    """State and registers of one IP block. A transition takes effect after its delay, evaluated lazily against the
+    simulator's clock whenever the block is accessed, so no background threads are needed however many blocks there are.
+    """
+
+    def __init__(self, model: IPBlockModel):
+        self.model = model
+        self.state = model.initial_state
+        self.registers = {}
+        self._pending = None
+
+    def current_state(self, now: float) -> str:
+        if self._pending is not None and now >= self._pending[1]:
+            self.state = self._pending[0]
+            self._pending = None
+        return self.state
+
+    def request(self, route: str, now: float, delay_sec: float) -> str:
+        if route in RESET_ROUTES:
+            target_state = self.model.initial_state
+        else:
+            # A transition still in progress is treated as complete, so routes can be sent back to back
+            if self._pending is not None:
+                self.state = self._pending[0]
+                self._pending = None
+            targets = self.model.transitions.get(route, {})
+            target_state = targets.get(self.state, targets.get("*"))
+            if target_state is None:
+                raise InvalidTransition(f"{route} is not allowed in state {self.state}")
+        self._pending = (target_state, now + delay_sec)
+        return target_state
+
+    def status(self, now: float) -> dict[str, Any]:
+        status = {"state": self.current_state(now), "registers": dict(self.registers)}
+        if self.model.status_flags is not None:
+            status.update(self.model.status_flags(self.registers))
+        return status
+
+
+class SimulatedEmulator:
+    """IP blocks of one bitstream emulator (i.e. one FHS-VCC stack), created on first use."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ip_blocks = {}
+
+    def ip_block(self, ip_block_id: str) -> SimulatedIPBlock:
+        if ip_block_id not in self.ip_blocks:
+            self.ip_blocks[ip_block_id] = SimulatedIPBlock(IP_BLOCK_MODELS.get(ip_block_id, _SIGNAL_PROCESSING_MODEL))
+        return self.ip_blocks[ip_block_id]
+
+
+class EmulatorSimulator:
+    """Simulates the IP blocks of any number of emulators in one process. Emulators are created on first use and
+    each has its own lock, so concurrent requests to different stacks don't contend.
+
+    Transitions take transition_delay_sec by default, overridable per (ip block, route) with transition_delays_sec.
+    The clock can be replaced (e.g. with a manually advanced one) to make timing fully deterministic.
+    """
+
+    def __init__(
+        self,
+        transition_delay_sec: float = 0.0,
+        transition_delays_sec: dict[tuple[str, str], float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.transition_delay_sec = transition_delay_sec
+        self.transition_delays_sec = transition_delays_sec or {}
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._emulators = {}
+
+    def __len__(self) -> int:
+        return len(self._emulators)
+
+    def emulator(self, emulator_id: str) -> SimulatedEmulator:
+        with self._lock:
+            if emulator_id not in self._emulators:
+                self._emulators[emulator_id] = SimulatedEmulator()
+            return self._emulators[emulator_id]
+
+    def get_state(self, emulator_id: str, ip_block_id: str | None) -> str:
+        if ip_block_id is None:
+            return "RUNNING"
+        emulator = self.emulator(emulator_id)
+        with emulator.lock:
+            return emulator.ip_block(ip_block_id).current_state(self.clock())
+
+    def get_status(self, emulator_id: str, ip_block_id: str) -> dict[str, Any]:
+        emulator = self.emulator(emulator_id)
+        with emulator.lock:
+            return emulator.ip_block(ip_block_id).status(self.clock())
+
+    def request(self, emulator_id: str, ip_block_id: str | None, route: str, body: Any = None) -> dict[str, Any]:
+        """
+        Handle a route sent to an emulator or one of its IP blocks. Routes sent to the emulator itself are sent to every IP block it has.
+        A configure body's registers (a dict under "registers") are written to the block.
+
+        :raises InvalidTransition: If the route isn't allowed in the block's current state
+        :returns: Target state of each IP block
+        """
+        emulator = self.emulator(emulator_id)
+        now = self.clock()
+        with emulator.lock:
+            ip_block_ids = [ip_block_id] if ip_block_id is not None else list(emulator.ip_blocks)
+            targets = {}
+            for block_id in ip_block_ids:
+                ip_block = emulator.ip_block(block_id)
+                if ip_block_id is None and route not in RESET_ROUTES and route not in ip_block.model.transitions:
+                    continue
+                delay_sec = self.transition_delays_sec.get((block_id, route), self.transition_delay_sec)
+                targets[block_id] = ip_block.request(route, now, delay_sec)
+                if route == "configure" and isinstance(body, dict):
+                    ip_block.registers.update(body.get("registers", {}))
+            return targets
+
+    def inject(self, event_groups: list[dict]) -> None:
+        """
+        Apply injector event groups. Only force_register_value events are modelled; they write the register straight away.
+        Event groups without an IP block are applied to every IP block the emulator has, like routes sent to the emulator itself.
+        """
+        for event_group in event_groups:
+            emulator = self.emulator(event_group["bitstream_emulator_id"])
+            ip_block_id = event_group.get("ip_block_emulator_id")
+            with emulator.lock:
+                ip_blocks = [emulator.ip_block(ip_block_id)] if ip_block_id is not None else list(emulator.ip_blocks.values())
+                for event in event_group["events"]:
+                    if event["value"].get("injection_type") == "force_register_value":
+                        for ip_block in ip_blocks:
+                            ip_block.registers[event["value"]["register_name"]] = event["value"]["register_value"]
@@ -0,0 +1,132 @@
+import pytest
+
+from local_emulator.simulator import EmulatorSimulator, InvalidTransition
+
+EMULATOR_ID = "fhs-vcc-emulator-1"
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> ManualClock:
+    return ManualClock()
+
+
+@pytest.fixture()
+def simulator(clock: ManualClock) -> EmulatorSimulator:
+    return EmulatorSimulator(transition_delay_sec=1.0, transition_delays_sec={("wideband_input_buffer", "start"): 5.0}, clock=clock)
+
+
+def test_blocks_start_in_their_initial_state(simulator: EmulatorSimulator):
+    assert simulator.get_state(EMULATOR_ID, None) == "RUNNING"
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "RESET"
+    assert simulator.get_state(EMULATOR_ID, "b123vcc") == "RESET"
+
+
+def test_transition_takes_effect_after_its_delay(simulator: EmulatorSimulator, clock: ManualClock):
+    assert simulator.request(EMULATOR_ID, "ethernet_200g", "start") == {"ethernet_200g": "LINK"}
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "RESET"
+    clock.now = 0.999
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "RESET"
+    clock.now = 1.0
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "LINK"
+
+
+def test_per_route_delay_overrides_default(simulator: EmulatorSimulator, clock: ManualClock):
+    simulator.request(EMULATOR_ID, "wideband_input_buffer", "configure")
+    clock.now = 1.0
+    assert simulator.get_state(EMULATOR_ID, "wideband_input_buffer") == "READY"
+    simulator.request(EMULATOR_ID, "wideband_input_buffer", "start")
+    clock.now = 5.0
+    assert simulator.get_state(EMULATOR_ID, "wideband_input_buffer") == "READY"
+    clock.now = 6.0
+    assert simulator.get_state(EMULATOR_ID, "wideband_input_buffer") == "ENABLED"
+
+
+def test_pending_transition_is_completed_by_next_route(simulator: EmulatorSimulator, clock: ManualClock):
+    simulator.request(EMULATOR_ID, "wideband_input_buffer", "configure")
+    # configure hasn't taken effect yet, but start is still allowed from READY
+    assert simulator.request(EMULATOR_ID, "wideband_input_buffer", "start") == {"wideband_input_buffer": "ENABLED"}
+
+
+def test_invalid_transition_is_rejected(simulator: EmulatorSimulator, clock: ManualClock):
+    with pytest.raises(InvalidTransition):
+        simulator.request(EMULATOR_ID, "wideband_input_buffer", "start")
+    with pytest.raises(InvalidTransition):
+        simulator.request(EMULATOR_ID, "ethernet_200g", "stop")
+    clock.now = 10.0
+    assert simulator.get_state(EMULATOR_ID, "wideband_input_buffer") == "RESET"
+
+
+def test_emulator_route_is_sent_to_every_block_which_supports_it(simulator: EmulatorSimulator, clock: ManualClock):
+    for ip_block_id in ("ethernet_200g", "b123vcc", "wideband_input_buffer"):
+        simulator.get_state(EMULATOR_ID, ip_block_id)
+    assert simulator.request(EMULATOR_ID, None, "configure") == {"b123vcc": "ACTIVE", "wideband_input_buffer": "READY"}
+
+
+def test_recover_resets_every_block(simulator: EmulatorSimulator, clock: ManualClock):
+    simulator.request(EMULATOR_ID, "ethernet_200g", "start")
+    simulator.request(EMULATOR_ID, "b123vcc", "configure")
+    clock.now = 1.0
+    assert simulator.request(EMULATOR_ID, None, "recover") == {"ethernet_200g": "RESET", "b123vcc": "RESET"}
+    clock.now = 2.0
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "RESET"
+    assert simulator.get_state(EMULATOR_ID, "b123vcc") == "RESET"
+
+
+def test_emulators_are_independent(simulator: EmulatorSimulator, clock: ManualClock):
+    simulator.request(EMULATOR_ID, "ethernet_200g", "start")
+    clock.now = 1.0
+    assert simulator.get_state(EMULATOR_ID, "ethernet_200g") == "LINK"
+    assert simulator.get_state("fhs-vcc-emulator-2", "ethernet_200g") == "RESET"
+    assert len(simulator) == 2
+
+
+def test_wib_status_flags_mismatches_with_configured_values(simulator: EmulatorSimulator):
+    registers = {"expected_dish_id": 1, "meta_dish_id": 1, "expected_sample_rate": 3960000000, "rx_sample_rate": 3960000000}
+    simulator.request(EMULATOR_ID, "wideband_input_buffer", "configure", {"registers": registers})
+    status = simulator.get_status(EMULATOR_ID, "wideband_input_buffer")
+    assert status["registers"] == registers
+    assert not status["dish_id_mismatch"]
+    assert not status["sample_rate_mismatch"]
+
+    simulator.inject(
+        [
+            {
+                "bitstream_emulator_id": EMULATOR_ID,
+                "ip_block_emulator_id": "wideband_input_buffer",
+                "events": [{"value": {"injection_type": "force_register_value", "register_name": "meta_dish_id", "register_value": 2}}],
+            }
+        ]
+    )
+    status = simulator.get_status(EMULATOR_ID, "wideband_input_buffer")
+    assert status["dish_id_mismatch"]
+    assert not status["sample_rate_mismatch"]
+
+
+def test_wib_status_flags_are_clear_until_configured(simulator: EmulatorSimulator):
+    status = simulator.get_status(EMULATOR_ID, "wideband_input_buffer")
+    assert not status["dish_id_mismatch"]
+    assert not status["sample_rate_mismatch"]
+    assert "dish_id_mismatch" not in simulator.get_status(EMULATOR_ID, "b123vcc")
+
+
+def test_injection_without_ip_block_is_applied_to_every_block(simulator: EmulatorSimulator):
+    for ip_block_id in ("ethernet_200g", "wideband_input_buffer"):
+        simulator.get_state(EMULATOR_ID, ip_block_id)
+    simulator.inject(
+        [
+            {
+                "bitstream_emulator_id": EMULATOR_ID,
+                "events": [{"value": {"injection_type": "force_register_value", "register_name": "rx_sample_rate", "register_value": 0}}],
+            }
+        ]
+    )
+    assert simulator.get_status(EMULATOR_ID, "ethernet_200g")["registers"] == {"rx_sample_rate": 0}
+    assert simulator.get_status(EMULATOR_ID, "wideband_input_buffer")["registers"] == {"rx_sample_rate": 0}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Creates a file containing log level counts for the various logs saved as part of a test run.
+
+Each log file is read once, counting every level in the same pass, and files are processed in parallel.
+Writes the tables to log_level_summary.txt and the same counts to log_level_summary.json, in the logs directory.
+
+Usage:
+    log_level_summary.py [--logs-dir logs] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+
+class LogCategory:
+    def __init__(self, title: str, key: str, file_prefix: str, levels: list[str], patterns: list[str]):
+        self.title = title
+        self.key = key
+        self.file_prefix = file_prefix
+        self.levels = levels
+        self.patterns = [pattern.encode() for pattern in patterns]
+
+
+LOG_CATEGORIES = [
+    # Log file names starting with ds- are assumed to be device server logs.
+    LogCategory(
+        "DEVICE SERVER LOGS",
+        "device_server",
+        "ds-",
+        ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"],
+        ["|CRITICAL|", "|ERROR|", "|WARNING|", "|INFO|", "|DEBUG|"],
+    ),
+    # Log file names starting with fhs-vcc-emulator- are assumed to be emulator logs.
+    LogCategory(
+        "EMULATOR LOGS",
+        "emulator",
+        "fhs-vcc-emulator-",
+        ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"],
+        ["[CRITICAL]", "[ERROR]", "[WARNING]", "[INFO]", "[DEBUG]"],
+    ),
+    # Log file names starting with database are assumed to be database logs.
+    LogCategory(
+        "DATABASE LOGS",
+        "database",
+        "database",
+        ["ERROR", "WARNING", "NOTE"],
+        ["[Error", "[Warn", "[Note"],
+    ),
+]
+
+
+def count_levels(path: str, patterns: list[bytes], chunk_size: int = 16 * 1024 * 1024) -> list[int]:
+    """Count the lines of a file containing each pattern (like grep | wc -l for each one), reading the file only once."""
+    # Each match consumes the rest of its line, so a line is counted once however many times the pattern occurs in it
+    line_patterns = [re.compile(re.escape(pattern) + rb"[^\n]*") for pattern in patterns]
+    counts = [0] * len(patterns)
+    with open(path, "rb") as log_file:
+        remainder = b""
+        while True:
+            block = log_file.read(chunk_size)
+            if not block:
+                chunk, remainder = remainder, b""
+            else:
+                # Only search whole lines, carrying any partial last line over to the next chunk
+                block = remainder + block
+                end = block.rfind(b"\n") + 1
+                chunk, remainder = block[:end], block[end:]
+            for i, line_pattern in enumerate(line_patterns):
+                counts[i] += len(line_pattern.findall(chunk))
+            if not block:
+                return counts
+
+
+def format_table(rows: list[list[str]]) -> str:
+    """Align columns like column -t."""
+    if not rows:
+        return ""
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() + "\n" for row in rows)
+
+
+def summarise(logs_dir: str, workers: int | None = None) -> dict[str, dict[str, dict[str, int]]]:
+    """
+    Count the log levels of every log file in the directory.
+
+    :returns: Counts keyed by category, then file name, then level
+    """
+    file_names = sorted(os.listdir(logs_dir))
+    jobs = [(category, file_name) for category in LOG_CATEGORIES for file_name in file_names if file_name.startswith(category.file_prefix)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(count_levels, os.path.join(logs_dir, file_name), category.patterns) for category, file_name in jobs]
+        summary = {category.key: {} for category in LOG_CATEGORIES}
+        for (category, file_name), future in zip(jobs, futures):
+            summary[category.key][file_name] = dict(zip(category.levels, future.result()))
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs-dir", default="logs", help="Directory containing the logs")
+    parser.add_argument("--workers", type=int, default=None, help="Number of files to process in parallel (defaults to the number of CPUs)")
+    args = parser.parse_args()
+
+    summary = summarise(args.logs_dir, args.workers)
+
+    sections = []
+    for category in LOG_CATEGORIES:
+        counts = summary[category.key]
+        rows = [["Logfile", *category.levels]] + [[file_name, *(str(counts[file_name][level]) for level in category.levels)] for file_name in counts]
+        sections.append(f"{category.title}\n" + (format_table(rows) if counts else ""))
+
+    with open(os.path.join(args.logs_dir, "log_level_summary.txt"), "w") as summary_file:
+        summary_file.write("\n".join(sections))
+    with open(os.path.join(args.logs_dir, "log_level_summary.json"), "w") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+    print("Log level summary capture complete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Stores per-test and per-command timings from each test run in a local SQLite database,
+keyed by the chart versions under test, and flags regressions against a rolling baseline of previous runs.
+
+Usage:
+    perf_history.py ingest [--report build/reports/report.json] [--chart charts/.../Chart.yaml] [--db ...]
+    perf_history.py check [--db ...] [--window 10] [--z-threshold 3.0] [--min-ratio 1.2]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+from datetime import datetime, timezone
+
+import yaml
+
+DEFAULT_DB = "build/perf_history.sqlite"
+DEFAULT_REPORT = "build/reports/report.json"
+DEFAULT_COMMAND_LATENCY_REPORT = "build/reports/command_latency.json"
+DEFAULT_CHART = "charts/ska-mid-cbf-fhs-system-tests/Chart.yaml"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    created_at TEXT NOT NULL,
+    chart_versions TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    test TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_by_key ON samples (test, metric, run);
+"""
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def read_chart_versions(chart_path: str, overrides: list[str]) -> dict[str, str]:
+    """Get the version of every chart dependency, with NAME=VERSION overrides applied
+    (the Makefile can override the versions in Chart.yaml at deploy time).
+    """
+    with open(chart_path) as chart_file:
+        chart = yaml.safe_load(chart_file)
+    versions = {dependency["name"]: str(dependency["version"]) for dependency in chart.get("dependencies", [])}
+    versions[chart["name"]] = str(chart["version"])
+    for override in overrides:
+        name, _, version = override.partition("=")
+        versions[name] = version
+    return versions
+
+
+def extract_samples(report: dict, command_latency_report: dict | None) -> list[tuple[str, str, float]]:
+    """Flatten a pytest JSON report (and optionally a command latency benchmark report) into (test, metric, value) samples."""
+    samples = []
+    for test in report.get("tests", []):
+        nodeid = test["nodeid"]
+        if test.get("outcome") != "passed":
+            continue
+        duration = sum(test.get(stage, {}).get("duration", 0.0) for stage in ("setup", "call", "teardown"))
+        samples.append((nodeid, "duration_sec", duration))
+        for name, stats in test.get("metadata", {}).get("metrics", {}).get("timings", {}).items():
+            samples.append((nodeid, f"{name}.total_sec", stats["total_sec"]))
+            samples.append((nodeid, f"{name}.mean_sec", stats["mean_sec"]))
+
+    for command_name, command_report in (command_latency_report or {}).items():
+        for metric, stats in command_report["all_stacks"].items():
+            samples.append((f"command:{command_name}", f"{metric}.p50_sec", stats["p50"]))
+            samples.append((f"command:{command_name}", f"{metric}.p95_sec", stats["p95"]))
+    return samples
+
+
+def ingest(conn: sqlite3.Connection, report_path: str, command_latency_report_path: str, chart_versions: dict[str, str], run_id: str | None) -> int:
+    with open(report_path) as report_file:
+        report = json.load(report_file)
+    command_latency_report = None
+    if os.path.exists(command_latency_report_path):
+        with open(command_latency_report_path) as command_latency_report_file:
+            command_latency_report = json.load(command_latency_report_file)
+
+    samples = extract_samples(report, command_latency_report)
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (run_id, created_at, chart_versions) VALUES (?, ?, ?)",
+            (run_id, datetime.now(timezone.utc).isoformat(), json.dumps(chart_versions, sort_keys=True)),
+        )
+        run = cursor.lastrowid
+        conn.executemany("INSERT INTO samples (run, test, metric, value) VALUES (?, ?, ?, ?)", [(run, *sample) for sample in samples])
+    print(f"Stored {len(samples)} samples as run {run}.")
+    return run
+
+
+def find_regressions(conn: sqlite3.Connection, window: int, z_threshold: float, min_ratio: float, min_baseline: int = 3) -> list[dict]:
+    """Compare every sample of the latest run against the same test/metric in up to `window` previous runs.
+    A sample is a regression if it is more than z_threshold standard deviations above the baseline mean
+    and also at least min_ratio times the baseline mean (so tiny absolute changes in very stable metrics are ignored).
+    """
+    latest = conn.execute("SELECT MAX(id) FROM runs").fetchone()[0]
+    if latest is None:
+        return []
+    baseline_runs = [row[0] for row in conn.execute("SELECT id FROM runs WHERE id < ? ORDER BY id DESC LIMIT ?", (latest, window))]
+    if len(baseline_runs) < min_baseline:
+        print(f"Only {len(baseline_runs)} previous runs stored, need at least {min_baseline} for a baseline.")
+        return []
+
+    baselines = {}
+    placeholders = ",".join("?" * len(baseline_runs))
+    for test, metric, value in conn.execute(f"SELECT test, metric, value FROM samples WHERE run IN ({placeholders})", baseline_runs):
+        baselines.setdefault((test, metric), []).append(value)
+
+    regressions = []
+    for test, metric, value in conn.execute("SELECT test, metric, value FROM samples WHERE run = ?", (latest,)):
+        baseline = baselines.get((test, metric), [])
+        if len(baseline) < min_baseline:
+            continue
+        mean = statistics.fmean(baseline)
+        stdev = statistics.stdev(baseline)
+        if mean <= 0 or value < mean * min_ratio:
+            continue
+        z_score = (value - mean) / stdev if stdev > 0 else float("inf")
+        if z_score >= z_threshold:
+            regressions.append({"test": test, "metric": metric, "value": value, "baseline_mean": mean, "baseline_stdev": stdev, "z_score": z_score})
+    return sorted(regressions, key=lambda r: r["value"] / r["baseline_mean"], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite database to store results in")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Store the results of a test run")
+    ingest_parser.add_argument("--report", default=DEFAULT_REPORT, help="pytest --json-report output")
+    ingest_parser.add_argument("--command-latency-report", default=DEFAULT_COMMAND_LATENCY_REPORT, help="Command latency benchmark output (optional)")
+    ingest_parser.add_argument("--chart", default=DEFAULT_CHART, help="Chart.yaml to read the versions under test from")
+    ingest_parser.add_argument("--chart-version", action="append", default=[], metavar="NAME=VERSION", help="Override a chart version")
+    ingest_parser.add_argument("--run-id", default=os.environ.get("CI_JOB_ID"), help="Identifier for the run (defaults to $CI_JOB_ID)")
+
+    check_parser = subparsers.add_parser("check", help="Flag regressions in the latest run against previous runs")
+    check_parser.add_argument("--window", type=int, default=10, help="Number of previous runs to use as the baseline")
+    check_parser.add_argument("--z-threshold", type=float, default=3.0, help="Minimum z-score for a regression")
+    check_parser.add_argument("--min-ratio", type=float, default=1.2, help="Minimum ratio of value to baseline mean for a regression")
+    check_parser.add_argument("--json", help="Also write the regressions to this JSON file")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.action == "ingest":
+        ingest(conn, args.report, args.command_latency_report, read_chart_versions(args.chart, args.chart_version), args.run_id)
+        return 0
+
+    regressions = find_regressions(conn, args.window, args.z_threshold, args.min_ratio)
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(regressions, json_file, indent=2)
+    if not regressions:
+        print("No regressions found.")
+        return 0
+
+    print(f"{len(regressions)} regression(s) found:")
+    for r in regressions:
+        print(f"  {r['test']} {r['metric']}: {r['value']:.3f} vs baseline {r['baseline_mean']:.3f} +/- {r['baseline_stdev']:.3f} (z={r['z_score']:.1f})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
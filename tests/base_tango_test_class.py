@@ -1,47 +1,71 @@
+import time
 from logging import Logger
 
 import pytest
-from connection_utils import DeviceKey, create_proxy, get_emulator_url, get_fqdn
-from ska_tango_testing.integration import TangoEventTracer
+from connection_utils import DeviceKey, ProxyPool, get_emulator_url, get_fqdn
+from device_discovery import DeviceDiscovery
+from event_store import EventStore
+from pytango_group_wrapper import PyTangoGroupWrapper
 
 
 class BaseTangoTestClass:
 
     @pytest.fixture(scope="session")
-    def all_proxies(self, logger: Logger):
-        # Pre-load all combinations for indices 1-6
-        logger.info("Creating proxies for all devices...")
-        proxies_cache = {(i,): {k: {i: create_proxy(i, k)} for k in DeviceKey} for i in range(1, 7)}
-        logger.info("Proxies created.")
-        return proxies_cache
+    def proxy_pool(self, request, logger: Logger, fhs_vcc_indices: list[int], device_discovery: DeviceDiscovery):
+        # Proxies are created on first use, so only the devices a run actually touches get connected,
+        # unless a run which touches every device asks for them all to be connected concurrently up front
+        pool = ProxyPool()
+        if request.config.getoption("--warm_up_proxies"):
+            logger.info("Creating proxies for all devices...")
+            start_time = time.monotonic()
+            pool.warm_up(fhs_vcc_indices, exclude=device_discovery.unavailable(fhs_vcc_indices))
+            logger.info(f"{len(pool)} proxies created in {time.monotonic() - start_time:.2f}s.")
+        yield pool
+        logger.info(f"Proxy pool: {len(pool)} proxies created, {pool.hits} hits, {pool.misses} misses. Slowest device servers:")
+        for fqdn, connect_time in pool.slowest(10):
+            logger.info(f"    {fqdn}: {connect_time:.3f}s")
+
+    @pytest.fixture(scope="session")
+    def event_store(self, logger: Logger):
+        # Each attribute is subscribed to once per session; tests get their own view of the events
+        store = EventStore()
+        yield store
+        logger.info(f"Unsubscribing from {len(store)} attributes.")
+        store.unsubscribe_all()
 
     @pytest.fixture()
-    def initialize_with_indices(self, request, logger: Logger, emulator_base_url: str, all_proxies) -> None:
+    def initialize_with_indices(self, request, logger: Logger, emulator_base_url: str, proxy_pool: ProxyPool, event_store: EventStore) -> None:
         idxs = request.param
         self.loaded_idxs = idxs if isinstance(idxs, list) else [idxs]
         self.logger = logger
 
         self.fqdns = {k: {i: get_fqdn(i, k) for i in self.loaded_idxs} for k in DeviceKey}
 
-        self.proxies = {k: {i: all_proxies[(i,)][k][i] for i in self.loaded_idxs} for k in DeviceKey}
+        self.proxies = proxy_pool.view(self.loaded_idxs)
 
         self.emulator_urls = {i: get_emulator_url(i, emulator_base_url) for i in self.loaded_idxs}
 
         self.pre_initialize()
 
-        self.event_tracer = TangoEventTracer()
+        self.event_store = event_store
+        self.event_store.discard_old_events()
+        self.events = self.event_store.view()
 
         for i in self.loaded_idxs:
             all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][i]
-            self.event_tracer.subscribe_event(all_bands_fqdn, "longRunningCommandResult")
-            self.event_tracer.subscribe_event(all_bands_fqdn, "adminMode")
-            self.event_tracer.subscribe_event(all_bands_fqdn, "state")
-            self.event_tracer.subscribe_event(all_bands_fqdn, "obsState")
-            self.event_tracer.subscribe_event(all_bands_fqdn, "communicationState")
-            self.event_tracer.subscribe_event(all_bands_fqdn, "healthState")
+            self.event_store.subscribe_event(all_bands_fqdn, "longRunningCommandResult")
+            self.event_store.subscribe_event(all_bands_fqdn, "adminMode")
+            self.event_store.subscribe_event(all_bands_fqdn, "state")
+            self.event_store.subscribe_event(all_bands_fqdn, "obsState")
+            self.event_store.subscribe_event(all_bands_fqdn, "communicationState")
+            self.event_store.subscribe_event(all_bands_fqdn, "healthState")
 
         self.post_initialize()
 
+    def create_group(self, device_key: DeviceKey) -> PyTangoGroupWrapper:
+        """Create a group for broadcasting to the given device on every loaded FHS-VCC stack."""
+        return PyTangoGroupWrapper(device_key.value, [self.fqdns[device_key][i] for i in self.loaded_idxs])
+
     def pre_initialize(self):
         """Testclass-specific pre-initialization. Runs after proxies and FQDNs are setup but before any other actions."""
 
@@ -0,0 +1,96 @@
+import json
+import os
+from typing import Any, NamedTuple
+
+import numpy as np
+from scan_utils import frequency_band_map
+
+
+class ConfigureScanExpectations(NamedTuple):
+    """Values the devices are expected to report after a successful ConfigureScan with a given config."""
+
+    frequency_band: int
+    """Expected all-bands frequencyBand."""
+    frequency_band_offset: list[float]
+    """Expected all-bands frequencyBandOffset (one per stream)."""
+    gains: np.ndarray
+    """Expected VCC-123 gains, in the order GetStatus reports them (all channels of one polarisation, then the other)."""
+    shift_frequency: float
+    """Expected WFS shift_frequency."""
+    band_select: int
+    """Expected FSS band_select."""
+    packetizer_vid: int | None
+    """Expected packetizer vid_register, if the config has fs_lanes."""
+
+
+class ParameterFile(NamedTuple):
+    """A file from test_parameters/, loaded and parsed once."""
+
+    path: str
+    raw: str
+    """File contents, e.g. for sending as the ConfigureScan argument."""
+    parsed: Any
+    """Parsed JSON. Shared by every test, so must not be modified."""
+    expectations: ConfigureScanExpectations | None
+    """Expectations derived from a ConfigureScan config, or None if the file isn't a valid one."""
+
+
+def _configure_scan_expectations(config: Any) -> ConfigureScanExpectations | None:
+    if not isinstance(config, dict) or config.get("frequency_band") not in frequency_band_map or "vcc_gain" not in config:
+        return None
+    try:
+        gains = np.reshape(np.asarray(config["vcc_gain"], dtype=float), (-1, 2)).transpose().flatten()
+    except ValueError:
+        return None
+    frequency_band = frequency_band_map[config["frequency_band"]]
+    frequency_band_offset = [config.get("frequency_band_offset_stream_1"), config.get("frequency_band_offset_stream_2")]
+    fs_lanes = config.get("fs_lanes")
+    return ConfigureScanExpectations(
+        frequency_band=frequency_band,
+        frequency_band_offset=frequency_band_offset,
+        gains=gains,
+        shift_frequency=frequency_band_offset[0],
+        band_select=frequency_band + 1,
+        packetizer_vid=fs_lanes[0].get("vlan_id") if fs_lanes else None,
+    )
+
+
+class ConfigRegistry:
+    """Every JSON file under test_parameters/, loaded and parsed once per session, with the expectations of each ConfigureScan config precomputed."""
+
+    def __init__(self, directory: str = "test_parameters"):
+        self.directory = directory
+        self.files = {}
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(directory, file_name)
+            with open(path) as parameter_file:
+                raw = parameter_file.read()
+            parsed = json.loads(raw)
+            self.files[path] = ParameterFile(path, raw, parsed, _configure_scan_expectations(parsed))
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def get(self, path: str) -> ParameterFile:
+        """
+        Get a file, by its path (e.g. "test_parameters/configure_scan_valid_1.json") or just its name.
+
+        :param path: Path or file name
+        :returns: The loaded file
+        """
+        if path not in self.files:
+            path = os.path.join(self.directory, os.path.basename(path))
+        return self.files[path]
+
+    def raw(self, path: str) -> str:
+        return self.get(path).raw
+
+    def parsed(self, path: str) -> Any:
+        return self.get(path).parsed
+
+    def expectations(self, path: str) -> ConfigureScanExpectations:
+        expectations = self.get(path).expectations
+        assert expectations is not None, f"{path} is not a valid ConfigureScan config"
+        return expectations
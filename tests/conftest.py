@@ -5,15 +5,25 @@
 import logging
 import os
 import os.path
+import random
 from typing import List
 
+import connection_utils
 import pytest
 import pytest_html
-from connection_utils import DeviceKey, create_proxy, get_fqdn
+from config_registry import ConfigRegistry
+from connection_utils import DEFAULT_FHS_VCC_INDICES, DeviceKey, async_http_client, create_proxy, get_fqdn, http_session_pool, parse_fhs_vcc_indices
+from device_discovery import DeviceDiscovery
 from dotenv import load_dotenv
+from metrics import metrics
+from pytango_client_wrapper import RetryPolicy, retry_policies
+from tracing import tracer
 
 load_dotenv()  # Load environment variables from .env file
 
+fhs_vcc_indices_key = pytest.StashKey[List[int]]()
+device_discovery_key = pytest.StashKey[DeviceDiscovery]()
+
 
 def pytest_addoption(parser):
     parser.addoption("--namespace", action="store", default="default")
@@ -23,24 +33,176 @@ def pytest_addoption(parser):
     parser.addoption(
         "--tango_host", action="store", default="databaseds-tango-base:10000"
     )
+    parser.addoption(
+        "--fhs_vcc_indices", action="store", default="auto",
+        help="FHS-VCC stacks to test, as indices and/or ranges (e.g. \"1-6\" or \"1,3,10-20\"), or \"auto\" to use every stack deployed in the Tango DB",
+    )
+    parser.addoption(
+        "--tango_timeout", action="store", type=float, default=3.0,
+        help="Client-side timeout (seconds) of each call to a Tango device",
+    )
+    parser.addoption(
+        "--tango_retries", action="store", type=int, default=2,
+        help="Number of times a call to a Tango device is retried (with exponential backoff) after a timeout or connection failure",
+    )
+    parser.addoption(
+        "--tango_retry_policy", action="append", default=[],
+        help="Timeout and retries for matching calls, as DEVICE_PATTERN[#COMMAND_OR_ATTRIBUTE]=TIMEOUT_SEC[,RETRIES], "
+        "e.g. \"fhs/vcc-all-bands/*#ConfigureScan=10,0\". May be given more than once",
+    )
+    parser.addoption(
+        "--warm_up_proxies", action="store_true", default=False,
+        help="Connect to every device of every FHS-VCC stack under test concurrently at the start of the session, instead of on first use",
+    )
+    parser.addoption(
+        "--parallel_stacks", action="store_true", default=False,
+        help="Run each phase of multi-stack tests on all FHS-VCC stacks concurrently instead of one stack at a time",
+    )
+    parser.addoption(
+        "--benchmark_iterations", action="store", type=int, default=10,
+        help="Number of times each command is run per stack by the benchmark tests",
+    )
+    parser.addoption(
+        "--soak_duration", action="store", type=float, default=0.0,
+        help="Run the soak tests for this many seconds (overrides --soak_cycles)",
+    )
+    parser.addoption(
+        "--soak_cycles", action="store", type=int, default=100,
+        help="Number of ConfigureScan/Scan/EndScan cycles run by the soak tests, if no --soak_duration is given",
+    )
+    parser.addoption(
+        "--soak_resource_attributes", action="store", default="",
+        help="Comma-separated device_key/attribute pairs (e.g. \"all_bands/memoryRss\") sampled after every soak cycle, for device servers which expose resource usage",
+    )
+    parser.addoption(
+        "--trace_file", action="store", default=None,
+        help="Write a Chrome trace of every Tango call, HTTP request, event wait and test to this file, for viewing in e.g. Perfetto",
+    )
+    parser.addoption(
+        "--http_pool_size", action="store", type=int, default=10,
+        help="Max number of keep-alive connections kept per emulator/injector host; raised to --http_async_workers if lower",
+    )
+    parser.addoption(
+        "--http_connect_timeout", action="store", type=float, default=5.0,
+        help="Connect timeout (seconds) for emulator/injector HTTP requests",
+    )
+    parser.addoption(
+        "--http_read_timeout", action="store", type=float, default=30.0,
+        help="Read timeout (seconds) for emulator/injector HTTP requests",
+    )
+    parser.addoption(
+        "--http_async_workers", action="store", type=int, default=32,
+        help="Max number of concurrent requests in flight from the async emulator/injector clients; each host keeps at least this many keep-alive connections",
+    )
+    parser.addoption(
+        "--emulator_base_url", action="store", default=None,
+        help="Base URL of the emulators (host:port[/path]); may contain {emulator_id}, e.g. \"localhost:5001/{emulator_id}\". Defaults to the cluster services",
+    )
+    parser.addoption(
+        "--inject_url", action="store", default=None,
+        help="URL of the injector's inject route. Defaults to the cluster service",
+    )
+    parser.addoption(
+        "--local_emulator", action="store_true", default=False,
+        help="Serve the emulator and injector APIs from a local stand-in server instead of the cluster services",
+    )
 
 
 def pytest_configure(config):
     pytest.test_marker = config.getoption("-m")
+    if config.getoption("--trace_file"):
+        tracer.enable()
+    config.addinivalue_line(
+        "markers",
+        "fhs_vcc_stacks(mode=\"each\", sample=None): parametrize initialize_with_indices over the FHS-VCC stacks under test, "
+        "either with one test per stack (\"each\") or one test on all of them (\"together\"), optionally on a fixed random sample of them",
+    )
+
+
+def get_device_discovery(config) -> DeviceDiscovery:
+    """Get the devices deployed in the Tango DB, querying it once per session."""
+    if device_discovery_key not in config.stash:
+        config.stash[device_discovery_key] = DeviceDiscovery.query(logging.getLogger(__name__), timeout_sec=config.getoption("--tango_timeout"))
+    return config.stash[device_discovery_key]
+
+
+def get_fhs_vcc_indices(config) -> List[int]:
+    """Get the indices of the FHS-VCC stacks under test, resolving them once per session."""
+    if fhs_vcc_indices_key not in config.stash:
+        indices = config.getoption("--fhs_vcc_indices")
+        if indices == "auto" and config.option.collectonly:
+            # Don't wait on the Tango DB just to list the tests
+            fhs_vcc_indices = DEFAULT_FHS_VCC_INDICES
+        elif indices == "auto":
+            fhs_vcc_indices = get_device_discovery(config).fhs_vcc_indices()
+            if not fhs_vcc_indices:
+                logging.getLogger(__name__).warning(f"No deployed FHS-VCC stacks found in the Tango DB, testing the default stacks {DEFAULT_FHS_VCC_INDICES}")
+                fhs_vcc_indices = DEFAULT_FHS_VCC_INDICES
+        else:
+            fhs_vcc_indices = parse_fhs_vcc_indices(indices)
+        config.stash[fhs_vcc_indices_key] = fhs_vcc_indices
+    return config.stash[fhs_vcc_indices_key]
+
+
+def pytest_generate_tests(metafunc):
+    marker = metafunc.definition.get_closest_marker("fhs_vcc_stacks")
+    if marker is None or "initialize_with_indices" not in metafunc.fixturenames:
+        return
+    mode = marker.args[0] if marker.args else marker.kwargs.get("mode", "each")
+    sample = marker.kwargs.get("sample")
+    if mode not in ("each", "together"):
+        raise ValueError(f"{metafunc.definition.nodeid}: unknown fhs_vcc_stacks mode {mode!r}")
+
+    fhs_vcc_idxs = get_fhs_vcc_indices(metafunc.config)
+    if sample is not None and sample < len(fhs_vcc_idxs):
+        # Seeded by the test name, so each test always gets the same stacks but different tests cover different ones
+        fhs_vcc_idxs = random.Random(metafunc.definition.name).sample(fhs_vcc_idxs, sample)
+
+    if mode == "each":
+        metafunc.parametrize("initialize_with_indices", fhs_vcc_idxs, ids=lambda i: f"fhs_vcc_idx={i}", indirect=True)
+    else:
+        metafunc.parametrize("initialize_with_indices", [fhs_vcc_idxs], ids=lambda i: f"fhs_vcc_stacks={len(i)}", indirect=True)
 
 
 def pytest_html_report_title(report):
     report.title = f"FHS System Test Results [tag: {pytest.test_marker}]"
 
 
-# TODO: Uncomment and use this in reporting performance/metrics
-#@pytest.hookimpl(hookwrapper=True)
-#def pytest_runtest_makereport(item, call):
-#    outcome = yield
-#    report = outcome.get_result()
-#    extras = getattr(report, "extras", [])
-#    extras.append(pytest_html.extras.html(f"<div>Performance results go here?</div>"))
-#    report.extras = extras
+def pytest_sessionfinish(session):
+    trace_file = session.config.getoption("--trace_file")
+    if trace_file:
+        tracer.write(trace_file)
+        logging.getLogger(__name__).info(f"Trace of {len(tracer)} spans written to {trace_file}")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # Spans the test's setup, call and teardown
+    with tracer.span(item.name, "test", test=item.nodeid):
+        yield
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    metrics.start_test(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    # Attach once teardown has finished, so the metrics cover the whole test including its fixtures
+    if report.when == "teardown":
+        extras = getattr(report, "extras", [])
+        extras.append(pytest_html.extras.html(metrics.html()))
+        report.extras = extras
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_runtest_metadata(item, call):
+    if call.when != "teardown":
+        return {}
+    return {"metrics": metrics.summary()}
 
 
 @pytest.fixture(scope="session")
@@ -62,13 +224,34 @@ def cluster_domain(request) -> str:
 
 
 @pytest.fixture(scope="session")
-def emulator_base_url(namespace: str, cluster_domain: str) -> str:
-    return f"{namespace}.svc.{cluster_domain}:5001"
+def local_emulator(request):
+    if not request.config.getoption("--local_emulator"):
+        yield None
+        return
+    # Only needed for offline runs, so only imported when asked for
+    from local_emulator.server import LocalEmulatorServer
+
+    with LocalEmulatorServer() as server:
+        yield server
+
+
+@pytest.fixture(scope="session")
+def emulator_base_url(request, namespace: str, cluster_domain: str, local_emulator) -> str:
+    if local_emulator is not None:
+        return f"{local_emulator.address}/{{emulator_id}}"
+    return request.config.getoption("--emulator_base_url") or f"{namespace}.svc.{cluster_domain}:5001"
 
 
 @pytest.fixture(scope="session")
-def inject_url(namespace: str, cluster_domain: str) -> str:
-    return f"http://injector-service.{namespace}.svc.{cluster_domain}:5002/inject"
+def inject_url(request, namespace: str, cluster_domain: str, local_emulator) -> str:
+    if local_emulator is not None:
+        return f"http://{local_emulator.address}/inject"
+    return request.config.getoption("--inject_url") or f"http://injector-service.{namespace}.svc.{cluster_domain}:5002/inject"
+
+
+@pytest.fixture(scope="session")
+def config_registry() -> ConfigRegistry:
+    return ConfigRegistry("test_parameters")
 
 
 @pytest.fixture(scope="session")
@@ -76,6 +259,77 @@ def tango_host(request) -> str:
     return request.config.getoption("--tango_host")
 
 
+@pytest.fixture(scope="session")
+def fhs_vcc_indices(request) -> List[int]:
+    return get_fhs_vcc_indices(request.config)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def device_discovery(request, logger: logging.Logger, fhs_vcc_indices: List[int]) -> DeviceDiscovery:
+    discovery = get_device_discovery(request.config)
+    discovery.report(logger, fhs_vcc_indices)
+    # Connect to devices by the names they are registered under
+    connection_utils.discovered_fqdns.update(discovery.fqdns())
+    return discovery
+
+
+@pytest.fixture(scope="session")
+def parallel_stacks(request) -> bool:
+    return request.config.getoption("--parallel_stacks")
+
+
+@pytest.fixture(scope="session")
+def benchmark_iterations(request) -> int:
+    return request.config.getoption("--benchmark_iterations")
+
+
+@pytest.fixture(scope="session")
+def soak_duration(request) -> float:
+    return request.config.getoption("--soak_duration")
+
+
+@pytest.fixture(scope="session")
+def soak_cycles(request) -> int:
+    return request.config.getoption("--soak_cycles")
+
+
+@pytest.fixture(scope="session")
+def soak_resource_attributes(request) -> List[tuple]:
+    resource_attributes = []
+    for resource_attribute in request.config.getoption("--soak_resource_attributes").split(","):
+        if resource_attribute.strip():
+            device_key, attr_name = resource_attribute.strip().split("/", 1)
+            resource_attributes.append((DeviceKey(device_key), attr_name))
+    return resource_attributes
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tango_retry_policies(request):
+    default_policy = RetryPolicy(timeout_sec=request.config.getoption("--tango_timeout"), max_retries=request.config.getoption("--tango_retries"))
+    retry_policies.configure(default_policy)
+    for policy_option in request.config.getoption("--tango_retry_policy"):
+        target, _, settings = policy_option.partition("=")
+        device_pattern, _, name = target.partition("#")
+        timeout_sec, _, max_retries = settings.partition(",")
+        policy = default_policy._replace(timeout_sec=float(timeout_sec), max_retries=int(max_retries) if max_retries else default_policy.max_retries)
+        retry_policies.set_policy(policy, device_pattern or "*", name or None)
+    yield retry_policies
+    retry_policies.configure(RetryPolicy())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def http_sessions(request):
+    http_session_pool.configure(
+        pool_size=request.config.getoption("--http_pool_size"),
+        connect_timeout_sec=request.config.getoption("--http_connect_timeout"),
+        read_timeout_sec=request.config.getoption("--http_read_timeout"),
+    )
+    async_http_client.configure(max_workers=request.config.getoption("--http_async_workers"))
+    yield http_session_pool
+    async_http_client.close()
+    http_session_pool.close()
+
+
 def pytest_sessionstart(session):
     namespace = session.config.getoption("--namespace")
     tango_host = session.config.getoption("--tango_host")
@@ -1,9 +1,19 @@
+import asyncio
+import functools
+import random
+import threading
 import time
+from collections.abc import Container, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any
+from typing import Any, NamedTuple
+from urllib.parse import urlsplit
 
 import requests
+from metrics import metrics
 from pytango_client_wrapper import PyTangoClientWrapper
+from requests.adapters import HTTPAdapter
+from tracing import tracer
 
 
 class DeviceKey(Enum):
@@ -59,13 +69,44 @@ fs_fqdn_map = {getattr(DeviceKey, f"FS{i}_WIDEBAND_POWER_METER"): f"fhs/fs{i}wpm
 
 fqdn_map = {**base_fqdn_map, **fs_fqdn_map}
 
+discovered_fqdns: dict[tuple[int, DeviceKey], str] = {}
+"""FQDNs of the devices registered in the Tango DB, keyed by (index, device key). Filled in by device discovery at session start."""
+
 
 def get_fqdn(fhs_vcc_idx: int, fqdn_key: DeviceKey) -> str:
-    """Get the FQDN for a given device name/key and index."""
+    """Get the FQDN for a given device name/key and index, as registered in the Tango DB if it was discovered there."""
+    discovered_fqdn = discovered_fqdns.get((fhs_vcc_idx, fqdn_key))
+    if discovered_fqdn is not None:
+        return discovered_fqdn
     mapped_idx = str(fhs_vcc_idx).zfill(3)
     return fqdn_map[fqdn_key] + mapped_idx
 
 
+DEFAULT_FHS_VCC_INDICES = list(range(1, 7))
+"""Stacks deployed by the chart's default instances list, used if the deployed stacks can't be discovered."""
+
+
+def parse_fhs_vcc_indices(indices: str) -> list[int]:
+    """
+    Parse a comma-separated list of FHS-VCC indices and/or inclusive ranges, e.g. "1-6" or "1,3,10-20".
+
+    :param indices: Indices to parse
+    :returns: The indices, sorted and without duplicates
+    """
+    fhs_vcc_idxs = set()
+    for part in indices.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, separator, last = part.partition("-")
+        if not first.isdigit() or (separator and not last.isdigit()):
+            raise ValueError(f"Invalid FHS-VCC index or range: {part}")
+        fhs_vcc_idxs.update(range(int(first), int(last or first) + 1))
+    if not fhs_vcc_idxs:
+        raise ValueError(f"No FHS-VCC indices given: {indices!r}")
+    return sorted(fhs_vcc_idxs)
+
+
 def create_proxy(fhs_vcc_idx: int, fqdn_key: DeviceKey) -> PyTangoClientWrapper:
     """Create and return a proxy wrapper for a given device name/key and index."""
     proxy = PyTangoClientWrapper()
@@ -73,15 +114,286 @@ def create_proxy(fhs_vcc_idx: int, fqdn_key: DeviceKey) -> PyTangoClientWrapper:
     return proxy
 
 
+class ProxyPool:
+    """Lazily populated pool of proxy wrappers keyed by (FHS-VCC index, device key).
+    Proxies are only created (and connected) the first time they are requested.
+    """
+
+    def __init__(self):
+        self._proxies: dict[tuple[int, DeviceKey], PyTangoClientWrapper] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple[int, DeviceKey], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.connect_times: dict[tuple[int, DeviceKey], float] = {}
+
+    def get(self, fhs_vcc_idx: int, fqdn_key: DeviceKey) -> PyTangoClientWrapper:
+        """Get the proxy wrapper for a given index and device name/key, creating it on first use."""
+        pool_key = (fhs_vcc_idx, fqdn_key)
+        with self._lock:
+            proxy = self._proxies.get(pool_key)
+            if proxy is not None:
+                self.hits += 1
+                return proxy
+            key_lock = self._key_locks.setdefault(pool_key, threading.Lock())
+
+        # Only hold the lock for this key while connecting, so different devices can be created concurrently
+        with key_lock:
+            with self._lock:
+                proxy = self._proxies.get(pool_key)
+                if proxy is not None:
+                    self.hits += 1
+                    return proxy
+                self.misses += 1
+            start_time = time.monotonic()
+            proxy = create_proxy(fhs_vcc_idx, fqdn_key)
+            with self._lock:
+                self.connect_times[pool_key] = time.monotonic() - start_time
+                self._proxies[pool_key] = proxy
+            return proxy
+
+    def warm_up(
+        self,
+        fhs_vcc_idxs: Iterable[int],
+        device_keys: Iterable[DeviceKey] = DeviceKey,
+        max_workers: int = 16,
+        exclude: Container[tuple[int, DeviceKey]] = (),
+    ) -> None:
+        """Create the proxies for every combination of the given indices and device keys up front,
+        using a bounded pool of worker threads. Any (index, device key) in exclude (e.g. undeployed devices) is skipped.
+        """
+        pool_keys = [(i, k) for i in fhs_vcc_idxs for k in device_keys if (i, k) not in exclude]
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="proxy-warm-up") as executor:
+            # list() so that any exception raised while connecting is propagated here
+            list(executor.map(lambda pool_key: self.get(*pool_key), pool_keys))
+
+    def slowest(self, count: int = 10) -> list[tuple[str, float]]:
+        """Get the FQDNs and connect times (in seconds) of the slowest proxies to be created, slowest first."""
+        with self._lock:
+            connect_times = sorted(self.connect_times.items(), key=lambda item: item[1], reverse=True)
+        return [(get_fqdn(i, k), t) for (i, k), t in connect_times[:count]]
+
+    def view(self, fhs_vcc_idxs: list[int]) -> "ProxyPoolView":
+        """Get a {DeviceKey: {index: proxy}} style mapping over the given indices, backed by this pool."""
+        return ProxyPoolView(self, fhs_vcc_idxs)
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+
+class ProxyPoolView(Mapping):
+    """Read-only {DeviceKey: {index: proxy}} mapping which only resolves proxies from the pool when accessed."""
+
+    def __init__(self, pool: ProxyPool, fhs_vcc_idxs: list[int]):
+        self._pool = pool
+        self._idxs = fhs_vcc_idxs
+
+    def __getitem__(self, fqdn_key: DeviceKey) -> "_ProxyPoolIndexView":
+        if not isinstance(fqdn_key, DeviceKey):
+            raise KeyError(fqdn_key)
+        return _ProxyPoolIndexView(self._pool, fqdn_key, self._idxs)
+
+    def __iter__(self) -> Iterator[DeviceKey]:
+        return iter(DeviceKey)
+
+    def __len__(self) -> int:
+        return len(DeviceKey)
+
+
+class _ProxyPoolIndexView(Mapping):
+    """Read-only {index: proxy} mapping for a single device key."""
+
+    def __init__(self, pool: ProxyPool, fqdn_key: DeviceKey, fhs_vcc_idxs: list[int]):
+        self._pool = pool
+        self._key = fqdn_key
+        self._idxs = fhs_vcc_idxs
+
+    def __getitem__(self, fhs_vcc_idx: int) -> PyTangoClientWrapper:
+        if fhs_vcc_idx not in self._idxs:
+            raise KeyError(fhs_vcc_idx)
+        return self._pool.get(fhs_vcc_idx, self._key)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._idxs)
+
+    def __len__(self) -> int:
+        return len(self._idxs)
+
+
 def get_emulator_id(fhs_vcc_idx: int) -> str:
     return f"fhs-vcc-emulator-{fhs_vcc_idx}"
 
 
 def get_emulator_url(fhs_vcc_idx: int, emulator_base_url: str) -> str:
-    """Get the emulator URL for a given device index and base URL."""
+    """Get the emulator URL for a given device index and base URL.
+    If the base URL contains {emulator_id}, the emulator ID is substituted in; otherwise it is prepended as a host name.
+    """
+    if "{emulator_id}" in emulator_base_url:
+        return emulator_base_url.format(emulator_id=get_emulator_id(fhs_vcc_idx))
     return f"{get_emulator_id(fhs_vcc_idx)}.{emulator_base_url}"
 
 
+def _trace_response(resp: requests.Response, *args, **kwargs) -> None:
+    # Response hook, called in the thread which sent the request as soon as the response has been received
+    tracer.add_span(f"{resp.request.method} {urlsplit(resp.url).path}", "http", resp.elapsed.total_seconds(), url=resp.url, status=resp.status_code)
+
+
+class HTTPSessionPool:
+    """Pool of keep-alive HTTP sessions, one per host, so that repeated requests to the same
+    emulator/injector reuse their connections instead of reconnecting every time.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout_sec: float = 5.0, read_timeout_sec: float = 30.0):
+        self.pool_size = pool_size
+        self.min_pool_size = 0
+        """Lower bound on the pool size, set by clients which may send this many requests to one host at once (see AsyncHTTPClient)."""
+        self.connect_timeout_sec = connect_timeout_sec
+        self.read_timeout_sec = read_timeout_sec
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def connections_per_host(self) -> int:
+        """Max number of keep-alive connections kept per host. Connections opened beyond this by concurrent requests are discarded after use."""
+        return max(self.pool_size, self.min_pool_size)
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        """The (connect, read) timeout to pass with each request."""
+        return self.connect_timeout_sec, self.read_timeout_sec
+
+    def configure(self, pool_size: int | None = None, connect_timeout_sec: float | None = None, read_timeout_sec: float | None = None) -> None:
+        """Update the pool settings. Existing sessions are closed so that the new pool size takes effect."""
+        if pool_size is not None:
+            self.pool_size = pool_size
+        if connect_timeout_sec is not None:
+            self.connect_timeout_sec = connect_timeout_sec
+        if read_timeout_sec is not None:
+            self.read_timeout_sec = read_timeout_sec
+        self.close()
+
+    def require_pool_size(self, pool_size: int) -> None:
+        """Make sure at least the given number of connections are kept per host. Existing sessions are closed if the pool size grows."""
+        if pool_size > self.min_pool_size:
+            self.min_pool_size = pool_size
+            self.close()
+
+    def session(self, url: str) -> requests.Session:
+        """Get the session for the host of the given URL, creating it on first use."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.connections_per_host)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.hooks["response"].append(_trace_response)
+                self._sessions[host] = session
+            return session
+
+    def close(self) -> None:
+        """Close all open sessions and their connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+http_session_pool = HTTPSessionPool()
+
+
+class AsyncHTTPClient:
+    """Asyncio front-end to an HTTPSessionPool. Requests are run on a shared, bounded thread pool,
+    so many of them can be awaited concurrently from one event loop while still reusing the pooled keep-alive connections.
+    The session pool keeps at least max_workers connections per host, as every worker may be sending to the same host.
+    """
+
+    def __init__(self, session_pool: HTTPSessionPool, max_workers: int = 32):
+        self.session_pool = session_pool
+        self.max_workers = max_workers
+        session_pool.require_pool_size(max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers: int) -> None:
+        """Update the maximum number of requests in flight at once."""
+        self.close()
+        self.max_workers = max_workers
+        self.session_pool.require_pool_size(max_workers)
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request with the given method to the given URL and return the response."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="async-http")
+            executor = self._executor
+        session = self.session_pool.session(url)
+        send = functools.partial(session.request, method, url, timeout=self.session_pool.timeout, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(executor, send)
+
+    def close(self) -> None:
+        """Shut down the worker threads. They are recreated on the next request."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+async_http_client = AsyncHTTPClient(http_session_pool)
+
+
+class StateWaitResult(NamedTuple):
+    """Result of waiting for an emulator/IP block state."""
+
+    state: Any
+    """The last retrieved state (will match the destination state unless timed out)."""
+    success: bool
+    """Whether the destination state was reached before the timeout."""
+    elapsed_sec: float
+    """Time taken to reach the destination state (or to time out)."""
+    polls: int
+    """Number of state requests sent."""
+
+
+def backoff_intervals(initial_sec: float, max_sec: float, factor: float = 2.0, jitter: bool = False) -> Iterator[float]:
+    """Generate an exponentially increasing sequence of poll intervals, starting at initial_sec and capped at max_sec.
+    If jitter is enabled, each interval is randomly picked from the upper half of its nominal value.
+    """
+    interval = initial_sec
+    while True:
+        yield random.uniform(interval / 2, interval) if jitter else interval
+        interval = min(interval * factor, max_sec)
+
+
+def _emulator_api_url(base_url: str, ip_block: EmulatorIPBlockId | None, route: str, param_string: str) -> str:
+    ip_string = f"/{ip_block.value}" if ip_block is not None else ""
+    return f"http://{base_url}{ip_string}/{route}/{param_string}"
+
+
+def _injector_event_groups(fhs_vcc_idx: int, ip_block: EmulatorIPBlockId | None, events_json: dict) -> dict:
+    event_group = {"bitstream_emulator_id": get_emulator_id(fhs_vcc_idx)}
+    if ip_block is not None:
+        event_group["ip_block_emulator_id"] = ip_block.value
+    event_group["events"] = events_json
+    return {"injector_event_groups": [event_group]}
+
+
+def _response_json(method: str, url: str, resp: requests.Response) -> Any:
+    metrics.record_timing(f"http.{method}", resp.elapsed.total_seconds())
+    if resp.status_code >= 300:
+        metrics.increment("http.errors")
+        raise Exception(f"{method}: {url} failed: {resp.content}")
+    return resp.json()
+
+
+def _record_state_wait(base_url: str, ip_block: EmulatorIPBlockId | None, state: str, result: StateWaitResult) -> None:
+    transition = f"{ip_block.value if ip_block is not None else 'emulator'}->{state}"
+    metrics.record_timing(f"emulator.state.{transition}", result.elapsed_sec)
+    metrics.increment("emulator.state_polls", result.polls)
+    tracer.add_span(f"wait_for_state {transition}", "emulator", result.elapsed_sec, url=base_url, success=result.success, polls=result.polls)
+
+
 class EmulatorAPIService:
     """Service containing methods for interacting with the emulator APIs."""
 
@@ -95,12 +407,9 @@ class EmulatorAPIService:
         """Send a GET request to the specified emulator URL, IP block ID (if specified) and route,
         and return the response contents.
         """
-        ip_string = f"/{ip_block.value}" if ip_block is not None else ""
-        full_url = f"http://{base_url}{ip_string}/{route}/{param_string}"
-        resp = requests.get(full_url)
-        if resp.status_code >= 300:
-            raise Exception(f"GET: {full_url} failed: {resp.content}")
-        return resp.json()
+        full_url = _emulator_api_url(base_url, ip_block, route, param_string)
+        resp = http_session_pool.session(full_url).get(full_url, timeout=http_session_pool.timeout)
+        return _response_json("GET", full_url, resp)
 
     @staticmethod
     def post(
@@ -113,34 +422,86 @@ class EmulatorAPIService:
         """Send a POST request to the specified emulator URL, IP block ID (if specified),
         route, and body, and return the response contents.
         """
-        ip_string = f"/{ip_block.value}" if ip_block is not None else ""
-        full_url = f"http://{base_url}{ip_string}/{route}/{param_string}"
-        resp = requests.post(full_url, json=body)
-        if resp.status_code >= 300:
-            raise Exception(f"POST: {full_url} failed: {resp.content}")
-        return resp.json()
+        full_url = _emulator_api_url(base_url, ip_block, route, param_string)
+        resp = http_session_pool.session(full_url).post(full_url, json=body, timeout=http_session_pool.timeout)
+        return _response_json("POST", full_url, resp)
 
     @staticmethod
     def wait_for_state(
         base_url: str,
         ip_block: EmulatorIPBlockId | None,
         state: str,
-        poll_interval_sec: int = 1,
-        timeout_sec: int = 60,
+        poll_interval_sec: float = 0.005,
+        timeout_sec: float = 60,
+        max_poll_interval_sec: float = 1.0,
+        backoff_factor: float = 2.0,
+        jitter: bool = False,
     ) -> tuple[str, bool]:
         """Poll the specified emulator/ip block state until it matches
         the specified destination state. Returns a 2-tuple containing the last retrieved state
         (will match the destination state unless timed out),
         and whether the retrieval was successful or not.
+
+        The poll interval starts at poll_interval_sec and backs off exponentially up to max_poll_interval_sec.
         """
-        start_time = time.time()
+        result = EmulatorAPIService._poll_state(
+            base_url,
+            ip_block,
+            state,
+            time.monotonic() + timeout_sec,
+            backoff_intervals(poll_interval_sec, max_poll_interval_sec, backoff_factor, jitter),
+        )
+        return result.state, result.success
+
+    @staticmethod
+    def wait_for_states(
+        base_url: str,
+        states: dict[EmulatorIPBlockId | None, str],
+        poll_interval_sec: float = 0.005,
+        timeout_sec: float = 60,
+        max_poll_interval_sec: float = 1.0,
+        backoff_factor: float = 2.0,
+        jitter: bool = False,
+    ) -> dict[EmulatorIPBlockId | None, StateWaitResult]:
+        """Concurrently poll the states of several IP blocks of the specified emulator until each matches
+        its destination state, or the shared timeout expires. Returns a StateWaitResult for each IP block.
+        """
+        deadline = time.monotonic() + timeout_sec
+        with ThreadPoolExecutor(max_workers=max(len(states), 1), thread_name_prefix="wait-for-states") as executor:
+            futures = {
+                ip_block: executor.submit(
+                    EmulatorAPIService._poll_state,
+                    base_url,
+                    ip_block,
+                    state,
+                    deadline,
+                    backoff_intervals(poll_interval_sec, max_poll_interval_sec, backoff_factor, jitter),
+                )
+                for ip_block, state in states.items()
+            }
+            return {ip_block: future.result() for ip_block, future in futures.items()}
+
+    @staticmethod
+    def _poll_state(
+        base_url: str,
+        ip_block: EmulatorIPBlockId | None,
+        state: str,
+        deadline: float,
+        poll_intervals: Iterator[float],
+    ) -> StateWaitResult:
+        start_time = time.monotonic()
+        polls = 0
         while True:
             got_state = EmulatorAPIService.get(base_url, ip_block, "state")
-            if got_state.get("current_state") == state:
-                return got_state, True
-            if time.time() > start_time + timeout_sec:
-                return got_state, False
-            time.sleep(poll_interval_sec)
+            polls += 1
+            now = time.monotonic()
+            success = got_state.get("current_state") == state
+            if success or now > deadline:
+                result = StateWaitResult(got_state, success, now - start_time, polls)
+                _record_state_wait(base_url, ip_block, state, result)
+                return result
+            # Never sleep past the deadline, so the final poll happens right as the timeout expires
+            time.sleep(min(next(poll_intervals), max(deadline - now, 0)))
 
 
 class InjectorAPIService:
@@ -153,16 +514,95 @@ class InjectorAPIService:
         ip_block: EmulatorIPBlockId,
         events_json: dict,
     ):
-        event_groups = {
-            "injector_event_groups": [
-                {
-                    "bitstream_emulator_id": get_emulator_id(fhs_vcc_idx),
-                    "ip_block_emulator_id": ip_block.value,
-                    "events": events_json,
-                }
-            ]
-        }
-        resp = requests.post(inject_url, json=event_groups)
-        if resp.status_code >= 300:
-            raise Exception(f"POST: {inject_url} failed: {resp.content}")
-        return resp.json()
+        event_groups = _injector_event_groups(fhs_vcc_idx, ip_block, events_json)
+        resp = http_session_pool.session(inject_url).post(inject_url, json=event_groups, timeout=http_session_pool.timeout)
+        return _response_json("POST", inject_url, resp)
+
+
+class AsyncEmulatorAPIService:
+    """Asyncio counterpart to EmulatorAPIService, for fanning requests out across many emulators/IP blocks at once."""
+
+    @staticmethod
+    async def get(
+        base_url: str,
+        ip_block: EmulatorIPBlockId | None = None,
+        route: str = "state",
+        param_string: str = "",
+    ) -> Any:
+        """Send a GET request to the specified emulator URL, IP block ID (if specified) and route,
+        and return the response contents.
+        """
+        full_url = _emulator_api_url(base_url, ip_block, route, param_string)
+        resp = await async_http_client.request("GET", full_url)
+        return _response_json("GET", full_url, resp)
+
+    @staticmethod
+    async def post(
+        base_url: str,
+        ip_block: EmulatorIPBlockId | None = None,
+        route: str = "start",
+        param_string: str = "",
+        body: dict | str = {},
+    ) -> Any:
+        """Send a POST request to the specified emulator URL, IP block ID (if specified),
+        route, and body, and return the response contents.
+        """
+        full_url = _emulator_api_url(base_url, ip_block, route, param_string)
+        resp = await async_http_client.request("POST", full_url, json=body)
+        return _response_json("POST", full_url, resp)
+
+    @staticmethod
+    async def wait_for_state(
+        base_url: str,
+        ip_block: EmulatorIPBlockId | None,
+        state: str,
+        poll_interval_sec: float = 0.005,
+        timeout_sec: float = 60,
+        max_poll_interval_sec: float = 1.0,
+        backoff_factor: float = 2.0,
+        jitter: bool = False,
+    ) -> StateWaitResult:
+        """Poll the specified emulator/ip block state until it matches the specified destination state,
+        with the same backoff behaviour as EmulatorAPIService.wait_for_state.
+        """
+        deadline = time.monotonic() + timeout_sec
+        poll_intervals = backoff_intervals(poll_interval_sec, max_poll_interval_sec, backoff_factor, jitter)
+        start_time = time.monotonic()
+        polls = 0
+        while True:
+            got_state = await AsyncEmulatorAPIService.get(base_url, ip_block, "state")
+            polls += 1
+            now = time.monotonic()
+            success = got_state.get("current_state") == state
+            if success or now > deadline:
+                result = StateWaitResult(got_state, success, now - start_time, polls)
+                _record_state_wait(base_url, ip_block, state, result)
+                return result
+            await asyncio.sleep(min(next(poll_intervals), max(deadline - now, 0)))
+
+    @staticmethod
+    async def wait_for_states(
+        base_url: str,
+        states: dict[EmulatorIPBlockId | None, str],
+        **kwargs,
+    ) -> dict[EmulatorIPBlockId | None, StateWaitResult]:
+        """Concurrently poll the states of several IP blocks of the specified emulator.
+        Accepts the same keyword arguments as wait_for_state.
+        """
+        results = await asyncio.gather(*(AsyncEmulatorAPIService.wait_for_state(base_url, ip_block, state, **kwargs) for ip_block, state in states.items()))
+        return dict(zip(states.keys(), results))
+
+
+class AsyncInjectorAPIService:
+    """Asyncio counterpart to InjectorAPIService."""
+
+    @staticmethod
+    async def send_events_to_ip_block(
+        inject_url: str,
+        fhs_vcc_idx: int,
+        ip_block: EmulatorIPBlockId,
+        events_json: dict,
+    ):
+        event_groups = _injector_event_groups(fhs_vcc_idx, ip_block, events_json)
+        resp = await async_http_client.request("POST", inject_url, json=event_groups)
+        return _response_json("POST", inject_url, resp)
@@ -0,0 +1,136 @@
+"""Discovery of the FHS devices deployed in the Tango DB"""
+
+import logging
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from logging import Logger
+from typing import NamedTuple
+
+from connection_utils import DeviceKey, fqdn_map
+from tango import Database, DevFailed
+
+FHS_DEVICE_PATTERN = "fhs/*"
+
+_DEVICE_QUERY = "SELECT name, exported, host, server FROM device WHERE name LIKE 'fhs/%'"
+
+
+class DiscoveredDevice(NamedTuple):
+    """A device registered in the Tango DB."""
+
+    fqdn: str
+    exported: bool
+    """Whether the device's server has started and exported it."""
+    host: str
+    """Host of the device's server, as last exported."""
+    server: str
+    """Device server instance, e.g. "ska-mid-cbf-fhs-vcc/fhs-vcc-1"."""
+
+
+class DeviceDiscovery:
+    """Index of the FHS-VCC devices registered in the Tango DB, keyed by (FHS-VCC index, device key).
+    Devices which don't follow the FHS-VCC naming convention are ignored.
+    """
+
+    def __init__(self, devices: list[DiscoveredDevice], queried: bool = True):
+        self.queried = queried
+        """Whether the Tango DB was actually queried; if not, nothing is known about what's deployed."""
+        prefixes = {prefix.lower(): key for key, prefix in fqdn_map.items()}
+        idx_pattern = re.compile(r"(.+/)(\d+)$")
+        self.devices: dict[tuple[int, DeviceKey], DiscoveredDevice] = {}
+        for device in devices:
+            match = idx_pattern.match(device.fqdn.lower())
+            if match and match.group(1) in prefixes:
+                self.devices[(int(match.group(2)), prefixes[match.group(1)])] = device
+
+    @classmethod
+    def query(cls, logger: Logger | None = None, timeout_sec: float = 3.0) -> "DeviceDiscovery":
+        """
+        Query the Tango DB for every FHS device, whether exported or not, along with the host of its server.
+        This is a single SQL query if the DB allows it, otherwise one call per device.
+
+        :param logger: Logger for errors; defaults to this module's
+        :param timeout_sec: Timeout of each call to the Tango DB, so that an unreachable DB is given up on quickly
+        :returns: The discovered devices, or an empty discovery (with queried False) if the Tango DB can't be queried
+        """
+        logger = logger or logging.getLogger(__name__)
+        try:
+            db = Database()
+            db.set_timeout_millis(int(timeout_sec * 1000))
+        except DevFailed as df:
+            logger.error(f"Failed to connect to the Tango DB for device discovery: {df}")
+            return cls([], queried=False)
+        try:
+            return cls(_select_devices(db))
+        except DevFailed as df:
+            logger.debug(f"DbMySqlSelect not available ({df.args[0].reason}), querying devices individually")
+        try:
+            return cls(_get_devices_info(db))
+        except DevFailed as df:
+            logger.error(f"Failed to query the Tango DB for device discovery: {df}")
+            return cls([], queried=False)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def fqdns(self) -> dict[tuple[int, DeviceKey], str]:
+        return {device_key: device.fqdn for device_key, device in self.devices.items()}
+
+    def get(self, fhs_vcc_idx: int, device_key: DeviceKey) -> DiscoveredDevice | None:
+        return self.devices.get((fhs_vcc_idx, device_key))
+
+    def fhs_vcc_indices(self) -> list[int]:
+        """Get the indices of the FHS-VCC stacks with an exported all-bands device."""
+        return sorted(i for (i, k), device in self.devices.items() if k == DeviceKey.ALL_BANDS and device.exported)
+
+    def missing(self, fhs_vcc_idxs: list[int]) -> list[tuple[int, DeviceKey]]:
+        """Get the devices of the given stacks which aren't registered in the Tango DB at all."""
+        if not self.queried:
+            return []
+        return [(i, k) for i in fhs_vcc_idxs for k in DeviceKey if (i, k) not in self.devices]
+
+    def not_exported(self, fhs_vcc_idxs: list[int]) -> list[tuple[int, DeviceKey]]:
+        """Get the devices of the given stacks which are registered but whose server hasn't exported them."""
+        return [(i, k) for i in fhs_vcc_idxs for k in DeviceKey if (i, k) in self.devices and not self.devices[(i, k)].exported]
+
+    def unavailable(self, fhs_vcc_idxs: list[int]) -> set[tuple[int, DeviceKey]]:
+        """Get the devices of the given stacks which can't be connected to, i.e. are missing or not exported."""
+        return set(self.missing(fhs_vcc_idxs)) | set(self.not_exported(fhs_vcc_idxs))
+
+    def report(self, logger: Logger, fhs_vcc_idxs: list[int]) -> None:
+        """Log a summary of the discovered devices, and any devices of the given stacks which are missing or not exported."""
+        if not self.queried:
+            logger.warning("Device discovery failed; devices will be connected to by their conventional FQDNs")
+            return
+        hosts = Counter(device.host for device in self.devices.values() if device.exported)
+        logger.info(
+            f"Discovered {len(self.devices)} FHS-VCC devices on {len(self.fhs_vcc_indices())} stacks, "
+            f"exported from {len(hosts)} hosts: " + ", ".join(f"{host} ({count})" for host, count in sorted(hosts.items()))
+        )
+        for description, device_keys in (("missing from the Tango DB", self.missing(fhs_vcc_idxs)), ("not exported", self.not_exported(fhs_vcc_idxs))):
+            if device_keys:
+                logger.warning(f"{len(device_keys)} devices under test are {description}:")
+                for fhs_vcc_idx in sorted({i for i, _ in device_keys}):
+                    logger.warning(f"    FHS-VCC {fhs_vcc_idx}: " + ", ".join(k.value for i, k in device_keys if i == fhs_vcc_idx))
+
+
+def _select_devices(db: Database) -> list[DiscoveredDevice]:
+    # Values come back as one flat list, with the row and column counts at the end of the long array
+    lvalue, svalue = db.command_inout("DbMySqlSelect", _DEVICE_QUERY)
+    num_rows, num_columns = lvalue[-2], lvalue[-1]
+    devices = []
+    for row_start in range(0, num_rows * num_columns, num_columns):
+        row_end = row_start + num_columns
+        name, exported, host, server = svalue[row_start:row_end]
+        devices.append(DiscoveredDevice(name, exported == "1", host, server))
+    return devices
+
+
+def _get_devices_info(db: Database, max_workers: int = 16) -> list[DiscoveredDevice]:
+    def get_device_info(fqdn: str) -> DiscoveredDevice:
+        info = db.get_device_info(fqdn)
+        return DiscoveredDevice(info.name, bool(info.exported), info.host, info.ds_full_name)
+
+    fqdns = db.command_inout("DbGetDeviceWideList", FHS_DEVICE_PATTERN)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="device-discovery") as executor:
+        return list(executor.map(get_device_info, fqdns))
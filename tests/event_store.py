@@ -0,0 +1,220 @@
+"""Store of Tango change events, indexed by device and attribute, with blocking waits for matching events"""
+
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, NamedTuple
+
+from metrics import metrics
+from tango import DevFailed, DeviceProxy, EventType
+from tracing import tracer
+
+_ANY_VALUE = object()
+
+
+class ReceivedEvent(NamedTuple):
+    """A change event received from a device."""
+
+    device_name: str
+    attribute_name: str
+    attribute_value: Any
+    reception_time: datetime
+    """Wall-clock time at which the event was received."""
+
+
+def _event_key(device_name: str, attribute_name: str) -> tuple[str, str]:
+    # Tango names are case-insensitive
+    return device_name.lower(), attribute_name.lower()
+
+
+class EventStore:
+    """Receives change events from any number of subscriptions. Events are kept per (device, attribute) in arrival order,
+    so a wait only ever looks at events of the attribute it is waiting on, and each event is checked at most once per wait.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._events = defaultdict(list)
+        self._sequences = defaultdict(list)
+        self._conditions = defaultdict(lambda: threading.Condition(self._lock))
+        self._subscribe_lock = threading.Lock()
+        self._device_proxies = {}
+        self._subscriptions = {}
+        self.logger = logging.getLogger(__name__)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe_event(self, device_name: str, attribute_name: str) -> None:
+        """
+        Subscribe to change events of an attribute, if not already subscribed. Tango sends the current value as an event straight away.
+
+        :param device_name: Device FQDN
+        :param attribute_name: Attribute to subscribe to
+        """
+        key = _event_key(device_name, attribute_name)
+        with self._subscribe_lock:
+            if key in self._subscriptions:
+                return
+            if device_name not in self._device_proxies:
+                self._device_proxies[device_name] = DeviceProxy(device_name)
+            with metrics.timed("event.subscribe"):
+                self._subscriptions[key] = self._device_proxies[device_name].subscribe_event(
+                    attribute_name, EventType.CHANGE_EVENT, partial(self._on_event, device_name, attribute_name)
+                )
+
+    def unsubscribe_all(self) -> None:
+        """
+        Unsubscribe from every attribute subscribed to.
+        """
+        with self._subscribe_lock:
+            for (device_name, attribute_name), subscription_id in self._subscriptions.items():
+                try:
+                    self._device_proxies[device_name].unsubscribe_event(subscription_id)
+                except DevFailed as e:
+                    self.logger.error(f"Failed to unsubscribe from {device_name}/{attribute_name}: {e}")
+            self._subscriptions = {}
+            self._device_proxies = {}
+
+    def _on_event(self, device_name: str, attribute_name: str, event) -> None:
+        if event.err:
+            self.logger.warning(f"Error event for {device_name}/{attribute_name}: {event.errors}")
+            return
+        self.add(ReceivedEvent(device_name, attribute_name, event.attr_value.value, datetime.now()))
+
+    def add(self, event: ReceivedEvent) -> None:
+        """
+        Store an event and wake up anything waiting on its attribute.
+
+        :param event: Event to store
+        """
+        key = _event_key(event.device_name, event.attribute_name)
+        with self._lock:
+            self._sequence += 1
+            self._events[key].append(event)
+            self._sequences[key].append(self._sequence)
+            self._conditions[key].notify_all()
+
+    def view(self, include_current: bool = True) -> "EventView":
+        """
+        Get a view of the events received from now on. Like a fresh subscription, the view also starts with
+        the latest event of every attribute already subscribed to, i.e. its current value, unless include_current is False.
+
+        :param include_current: Whether to include the latest event of each attribute already received
+        :returns: View starting at the latest event of each attribute, or at the next event if not include_current
+        """
+        with self._lock:
+            return EventView(self, self._sequence + 1, include_current)
+
+    def discard_old_events(self) -> None:
+        """
+        Discard every event except the latest of each attribute. Any existing views should no longer be used.
+        """
+        with self._lock:
+            for key, events in self._events.items():
+                del events[:-1]
+                del self._sequences[key][:-1]
+
+
+class EventView:
+    """Events of an EventStore from a given point on, e.g. the start of a test."""
+
+    def __init__(self, store: EventStore, start_sequence: int, include_current: bool = True):
+        self.store = store
+        self.start_sequence = start_sequence
+        self.include_current = include_current
+
+    def _start_position(self, key: tuple[str, str]) -> int:
+        position = bisect.bisect_left(self.store._sequences[key], self.start_sequence)
+        # Include the latest event before the start, which holds the value at the start
+        return max(position - 1, 0) if self.include_current else position
+
+    @property
+    def events(self) -> list[ReceivedEvent]:
+        """All events in the view, in arrival order."""
+        with self.store._lock:
+            sequenced = []
+            for key, events in self.store._events.items():
+                start_position = self._start_position(key)
+                sequenced.extend(zip(self.store._sequences[key][start_position:], events[start_position:]))
+        return [event for _, event in sorted(sequenced, key=lambda s: s[0])]
+
+    def events_for(self, device_name: str, attribute_name: str) -> list[ReceivedEvent]:
+        """
+        Get the events of a single attribute in the view.
+
+        :param device_name: Device FQDN
+        :param attribute_name: Attribute name
+        :returns: Events in arrival order
+        """
+        key = _event_key(device_name, attribute_name)
+        with self.store._lock:
+            start_position = self._start_position(key)
+            return self.store._events[key][start_position:]
+
+    def wait_for_event(self, device_name: str, attribute_name: str, predicate: Callable[[ReceivedEvent], bool], timeout_sec: float) -> ReceivedEvent | None:
+        """
+        Wait for an event of the given attribute matching the predicate, including events already received.
+
+        :param device_name: Device FQDN
+        :param attribute_name: Attribute name
+        :param predicate: Function returning True for a matching event
+        :param timeout_sec: Max time to wait in seconds
+        :returns: The first matching event, or None if none arrived in time
+        """
+        key = _event_key(device_name, attribute_name)
+        deadline = time.monotonic() + timeout_sec
+        with self.store._lock:
+            events = self.store._events[key]
+            condition = self.store._conditions[key]
+            position = self._start_position(key)
+            while True:
+                for event in events[position:]:
+                    if predicate(event):
+                        return event
+                position = len(events)
+                remaining_sec = deadline - time.monotonic()
+                if remaining_sec <= 0:
+                    return None
+                condition.wait(remaining_sec)
+
+    def assert_change_event_occurred(
+        self,
+        device_name: str,
+        attribute_name: str,
+        attribute_value: Any = _ANY_VALUE,
+        custom_matcher: Callable[[ReceivedEvent], bool] | None = None,
+        timeout_sec: float = 60,
+    ) -> ReceivedEvent:
+        """
+        Assert that a change event with the given value (and/or matching the custom matcher) occurred, waiting for it if needed.
+
+        :param device_name: Device FQDN
+        :param attribute_name: Attribute name
+        :param attribute_value: Expected value; any value if not given
+        :param custom_matcher: Function returning True for a matching event
+        :param timeout_sec: Max time to wait in seconds
+        :returns: The first matching event
+        """
+
+        def predicate(event: ReceivedEvent) -> bool:
+            if attribute_value is not _ANY_VALUE and event.attribute_value != attribute_value:
+                return False
+            return custom_matcher is None or custom_matcher(event)
+
+        with metrics.timed(f"event.wait.{attribute_name}"), tracer.span(f"wait_for_event {attribute_name}", "event", device=device_name, name=attribute_name):
+            event = self.wait_for_event(device_name, attribute_name, predicate, timeout_sec)
+
+        if event is None:
+            metrics.increment("event.timeouts")
+            expected = f"value {attribute_value!r}" if attribute_value is not _ANY_VALUE else "an event"
+            if custom_matcher is not None:
+                expected += " matching the custom matcher"
+            received = [e.attribute_value for e in self.events_for(device_name, attribute_name)]
+            raise AssertionError(f"Expected {expected} for {device_name}/{attribute_name} within {timeout_sec}s. Received values: {received}")
+        return event
@@ -0,0 +1,103 @@
+import json
+import os
+from collections import defaultdict
+from typing import Callable
+
+import numpy as np
+import pytest
+from connection_utils import DeviceKey
+from scan_sequence_test_class import ScanSequenceTestClass
+from ska_tango_base.control_model import AdminMode, ObsState
+
+
+def latency_stats(latencies: list[float]) -> dict[str, float]:
+    """Summarise a list of latencies (in seconds) as p50/p95/p99/max."""
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"count": len(latencies), "p50": p50, "p95": p95, "p99": p99, "max": max(latencies)}
+
+
+@pytest.mark.H1
+@pytest.mark.benchmark
+class TestCommandLatency(ScanSequenceTestClass):
+
+    def pre_initialize(self) -> None:
+        # {command: {fhs_vcc_idx: [{metric: latency_sec}]}}
+        self.latency_samples = defaultdict(lambda: defaultdict(list))
+
+    def run_and_record_latency(self, fhs_vcc_idx: int, run_command: Callable[..., None], *args) -> None:
+        """Run one of the command helpers, then record the latencies of the command it sent:
+        the command call itself, the longRunningCommandResult event, and each obsState transition.
+        """
+        run_command(fhs_vcc_idx, *args)
+
+        dispatch = self.last_dispatches[fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        try:
+            command_id = f"{dispatch.result[1][0]}"
+        except (TypeError, IndexError):
+            command_id = None
+
+        sample = {"dispatch": dispatch.latency_sec}
+        for event in self.events.events_for(all_bands_fqdn, "longRunningCommandResult"):
+            if event.reception_time >= dispatch.dispatch_time and event.attribute_value and event.attribute_value[0] == command_id:
+                sample.setdefault("result_event", (event.reception_time - dispatch.dispatch_time).total_seconds())
+        for event in self.events.events_for(all_bands_fqdn, "obsState"):
+            if event.reception_time >= dispatch.dispatch_time:
+                sample.setdefault(f"obsState={ObsState(event.attribute_value).name}", (event.reception_time - dispatch.dispatch_time).total_seconds())
+
+        self.logger.debug(f"{dispatch.command_name} latencies for FHS-VCC {fhs_vcc_idx}: {sample}")
+        self.latency_samples[dispatch.command_name][fhs_vcc_idx].append(sample)
+
+    def report_latencies(self, report_path: str) -> None:
+        report = {}
+        for command_name, stack_samples in self.latency_samples.items():
+            per_metric = defaultdict(list)
+            per_stack = {}
+            for fhs_vcc_idx, samples in stack_samples.items():
+                stack_metrics = defaultdict(list)
+                for sample in samples:
+                    for metric, latency_sec in sample.items():
+                        per_metric[metric].append(latency_sec)
+                        stack_metrics[metric].append(latency_sec)
+                per_stack[fhs_vcc_idx] = {metric: latency_stats(latencies) for metric, latencies in stack_metrics.items()}
+            report[command_name] = {
+                "all_stacks": {metric: latency_stats(latencies) for metric, latencies in per_metric.items()},
+                "per_stack": per_stack,
+            }
+
+        self.logger.info(f"{'Command':<14} {'Metric':<24} {'Count':>6} {'p50 (s)':>9} {'p95 (s)':>9} {'p99 (s)':>9} {'max (s)':>9}")
+        for command_name, command_report in report.items():
+            for metric, stats in command_report["all_stacks"].items():
+                self.logger.info(f"{command_name:<14} {metric:<24} {stats['count']:>6} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['p99']:>9.3f} {stats['max']:>9.3f}")
+
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        self.logger.info(f"Command latency report written to {report_path}")
+
+    @pytest.mark.fhs_vcc_stacks("together")
+    def test_all_bands_command_latency(self, initialize_with_indices, benchmark_iterations: int) -> None:
+        for fhs_vcc_idx in self.loaded_idxs:
+            self.reset_emulators_and_assert_successful(fhs_vcc_idx)
+            self.set_admin_mode_and_assert_change_events_occurred(fhs_vcc_idx, AdminMode.ONLINE)
+
+        for iteration in range(benchmark_iterations):
+            self.logger.info(f"Benchmark iteration {iteration + 1}/{benchmark_iterations}")
+            for fhs_vcc_idx in self.loaded_idxs:
+                # ConfigureScan -> Scan -> EndScan -> GoToIdle
+                self.run_and_record_latency(fhs_vcc_idx, self.run_configure_scan_and_assert_success, "test_parameters/configure_scan_valid_1.json")
+                self.run_and_record_latency(fhs_vcc_idx, self.run_scan_and_assert_success)
+                self.run_and_record_latency(fhs_vcc_idx, self.run_end_scan_and_assert_success)
+                self.run_and_record_latency(fhs_vcc_idx, self.run_go_to_idle_and_assert_success)
+
+                # ConfigureScan -> Scan -> AbortCommands -> ObsReset
+                self.run_and_record_latency(fhs_vcc_idx, self.run_configure_scan_and_assert_success, "test_parameters/configure_scan_valid_1.json")
+                self.run_and_record_latency(fhs_vcc_idx, self.run_scan_and_assert_success)
+                self.run_and_record_latency(fhs_vcc_idx, self.run_abort_and_assert_success)
+                self.run_and_record_latency(fhs_vcc_idx, self.run_obsreset_and_assert_success)
+
+        for fhs_vcc_idx in self.loaded_idxs:
+            self.set_admin_mode_and_assert_change_events_occurred(fhs_vcc_idx, AdminMode.OFFLINE)
+            self.reset_emulators_and_assert_successful(fhs_vcc_idx)
+
+        self.report_latencies("build/reports/command_latency.json")
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import pytest
 from base_tango_test_class import BaseTangoTestClass
-from connection_utils import DeviceKey, EmulatorAPIService
+from connection_utils import DeviceKey, EmulatorAPIService, get_fqdn
+from device_discovery import DeviceDiscovery
+from pytango_group_wrapper import GroupReplies, PyTangoGroupWrapper
 from tango import DevState
 
 
@@ -11,21 +13,36 @@ from tango import DevState
 @pytest.mark.nightly
 class TestDeployment(BaseTangoTestClass):
 
-    @pytest.mark.parametrize("initialize_with_indices", [1, 2, 3, 4, 5, 6], ids=lambda i: f"fhs_vcc_idx={i}", indirect=["initialize_with_indices"])
+    @pytest.fixture(scope="class")
+    def device_states(self, fhs_vcc_indices: list[int], device_discovery: DeviceDiscovery) -> GroupReplies:
+        # Read State from every deployed device on every stack in one broadcast instead of one proxy at a time
+        unavailable = device_discovery.unavailable(fhs_vcc_indices)
+        fqdns = [get_fqdn(i, k) for i in fhs_vcc_indices for k in DeviceKey if (i, k) not in unavailable]
+        return PyTangoGroupWrapper("all_devices", fqdns).read_attribute("State")
+
+    @pytest.mark.fhs_vcc_stacks("each")
     @pytest.mark.parametrize("device_key", DeviceKey)
-    def test_device_servers_are_deployed_and_opstate_is_on(self: TestDeployment, initialize_with_indices, device_key):
+    def test_device_servers_are_deployed_and_opstate_is_on(
+        self: TestDeployment, initialize_with_indices, device_key, device_states: GroupReplies, device_discovery: DeviceDiscovery
+    ):
         fhs_vcc_idx = self.loaded_idxs[0]
-        state = self.proxies[device_key][fhs_vcc_idx].read_attribute("State")
+        fqdn = self.fqdns[device_key][fhs_vcc_idx]
+        if device_discovery.queried:
+            device = device_discovery.get(fhs_vcc_idx, device_key)
+            assert device is not None, f"{fqdn} is not registered in the Tango DB"
+            assert device.exported, f"{fqdn} is registered in the Tango DB but not exported by {device.server}"
+        assert fqdn not in device_states.errors, f"Failed to read State from {fqdn}: {device_states.errors.get(fqdn)}"
+        state = device_states.values.get(fqdn)
         self.logger.info(f"{device_key} state is: {state}")
         assert state == DevState.ON
 
-    @pytest.mark.parametrize("initialize_with_indices", [1, 2, 3, 4, 5, 6], ids=lambda i: f"fhs_vcc_idx={i}", indirect=["initialize_with_indices"])
+    @pytest.mark.fhs_vcc_stacks("each")
     def test_emulator_is_deployed_and_running(self: TestDeployment, initialize_with_indices):
         emulator1_json = EmulatorAPIService.get(self.emulator_urls[self.loaded_idxs[0]], route="state")
         self.logger.info(f"Emulator state is: {emulator1_json.get('current_state', 'None')}")
         assert emulator1_json.get("current_state") == "RUNNING"
 
-    @pytest.mark.parametrize("initialize_with_indices", [1, 2, 3, 4, 5, 6], ids=lambda i: f"fhs_vcc_idx={i}", indirect=["initialize_with_indices"])
+    @pytest.mark.fhs_vcc_stacks("each")
     @pytest.mark.parametrize("device_key", DeviceKey)
     def test_device_servers_can_send_emulator_api_requests_and_get_responses(self: TestDeployment, initialize_with_indices, device_key):
         if device_key == DeviceKey.ALL_BANDS:
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Callable
+
+import numpy as np
+import pytest
+from connection_utils import DeviceKey
+from scan_sequence_test_class import VALID_CONFIGURE_SCAN_PATHS, ScanSequenceTestClass
+from ska_tango_base.control_model import AdminMode
+from stack_runner import StackPhaseRunner
+
+
+def drift_stats(elapsed_sec: list[float], values: list[float]) -> dict[str, float]:
+    """Fit a line to a series sampled over the soak, to show whether it grows over time."""
+    stats = {"count": len(values), "first": values[0], "last": values[-1], "mean": float(np.mean(values)), "max": float(np.max(values))}
+    if len(values) >= 2 and elapsed_sec[-1] > elapsed_sec[0]:
+        slope, intercept = np.polyfit(elapsed_sec, values, 1)
+        stats["slope_per_hour"] = float(slope * 3600)
+        # Change of the fitted line over the whole soak, relative to where it started
+        stats["fitted_change_pct"] = float(100 * slope * (elapsed_sec[-1] - elapsed_sec[0]) / intercept) if intercept else float("nan")
+    return stats
+
+
+@pytest.mark.H1
+@pytest.mark.soak
+class TestSoak(ScanSequenceTestClass):
+
+    def pre_initialize(self) -> None:
+        # Per sample: elapsed seconds since the soak started, and the value
+        self.latency_samples = defaultdict(lambda: ([], []))
+        self.resource_samples = defaultdict(lambda: ([], []))
+
+    def record_latency(self, command_name: str, fhs_vcc_idx: int, elapsed_sec: float, latency_sec: float) -> None:
+        timestamps, latencies = self.latency_samples[(command_name, fhs_vcc_idx)]
+        timestamps.append(elapsed_sec)
+        latencies.append(latency_sec)
+
+    def sample_resources(self, resource_attributes: list[tuple[DeviceKey, str]], elapsed_sec: float) -> None:
+        """Read the given resource attributes (e.g. memory or thread counts) of every stack's devices, if they expose them."""
+        for device_key, attr_name in resource_attributes:
+            for fhs_vcc_idx in self.loaded_idxs:
+                proxy = self.proxies[device_key][fhs_vcc_idx]
+                value = proxy.read_attributes([attr_name])[attr_name]
+                if value is None:
+                    self.logger.debug(f"Could not read {attr_name} from {device_key.value} {fhs_vcc_idx}: {proxy.last_read_errors.get(attr_name)}")
+                    continue
+                timestamps, values = self.resource_samples[(f"{device_key.value}/{attr_name}", fhs_vcc_idx)]
+                timestamps.append(elapsed_sec)
+                values.append(float(value))
+
+    def report_soak(self, report_path: str, cycles: int, duration_sec: float) -> None:
+        cycles_per_minute = 60 * cycles / duration_sec if duration_sec > 0 else 0.0
+        report = {
+            "cycles": cycles,
+            "duration_sec": duration_sec,
+            "cycles_per_minute": cycles_per_minute,
+            "stacks": self.loaded_idxs,
+            "latency": defaultdict(dict),
+            "resources": defaultdict(dict),
+        }
+        for (command_name, fhs_vcc_idx), (timestamps, latencies) in self.latency_samples.items():
+            report["latency"][command_name][fhs_vcc_idx] = drift_stats(timestamps, latencies)
+        for (resource, fhs_vcc_idx), (timestamps, values) in self.resource_samples.items():
+            report["resources"][resource][fhs_vcc_idx] = drift_stats(timestamps, values)
+
+        self.logger.info(f"Soak: {cycles} cycles on FHS-VCC {self.loaded_idxs} in {duration_sec:.1f}s ({cycles_per_minute:.2f} cycles/min)")
+        self.logger.info(f"{'Series':<40} {'Stack':>5} {'First':>10} {'Last':>10} {'Mean':>10} {'Max':>10} {'Slope/h':>10} {'Drift %':>8}")
+        for section in ("latency", "resources"):
+            for series, stacks in report[section].items():
+                for fhs_vcc_idx, stats in stacks.items():
+                    self.logger.info(
+                        f"{series:<40} {fhs_vcc_idx:>5} {stats['first']:>10.3f} {stats['last']:>10.3f} {stats['mean']:>10.3f} {stats['max']:>10.3f}"
+                        f" {stats.get('slope_per_hour', float('nan')):>10.3f} {stats.get('fitted_change_pct', float('nan')):>8.1f}"
+                    )
+
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        self.logger.info(f"Soak report written to {report_path}")
+
+    @pytest.mark.fhs_vcc_stacks("together")
+    def test_soak_scan_cycles(
+        self,
+        initialize_with_indices,
+        parallel_stacks: bool,
+        soak_duration: float,
+        soak_cycles: int,
+        soak_resource_attributes: list[tuple[DeviceKey, str]],
+    ) -> None:
+        runner = StackPhaseRunner(self.loaded_idxs, parallel_stacks, self.logger)
+
+        def set_up_stack(fhs_vcc_idx: int) -> None:
+            self.reset_emulators_and_assert_successful(fhs_vcc_idx)
+            self.set_admin_mode_and_assert_change_events_occurred(fhs_vcc_idx, AdminMode.ONLINE)
+
+        def tear_down_stack(fhs_vcc_idx: int) -> None:
+            self.run_go_to_idle_and_assert_success(fhs_vcc_idx)
+            self.set_admin_mode_and_assert_change_events_occurred(fhs_vcc_idx, AdminMode.OFFLINE)
+            self.reset_emulators_and_assert_successful(fhs_vcc_idx)
+
+        def timed(command_name: str, run_command: Callable[..., None], *args) -> Callable[[int], None]:
+            def action(fhs_vcc_idx: int) -> None:
+                command_start = time.monotonic()
+                run_command(fhs_vcc_idx, *args)
+                self.record_latency(command_name, fhs_vcc_idx, command_start - soak_start, time.monotonic() - command_start)
+
+            return action
+
+        def run_phase(phase: str, action: Callable[[int], None]) -> None:
+            # Only match events sent after this phase's commands, not the same obsStates reached in earlier phases and cycles
+            self.events = self.event_store.view(include_current=False)
+            runner.run(phase, action)
+
+        runner.run("setup", set_up_stack)
+
+        soak_start = time.monotonic()
+        cycles = 0
+        self.sample_resources(soak_resource_attributes, 0.0)
+        # Run for the given duration if there is one, otherwise for the given number of cycles
+        while (time.monotonic() - soak_start < soak_duration) if soak_duration > 0 else (cycles < soak_cycles):
+            config_path = VALID_CONFIGURE_SCAN_PATHS[cycles % len(VALID_CONFIGURE_SCAN_PATHS)]
+            cycle_start = time.monotonic()
+            # Keep the number of stored events bounded however many cycles are run
+            self.event_store.discard_old_events()
+
+            # ConfigureScan -> Scan -> EndScan
+            run_phase("ConfigureScan", timed("ConfigureScan", self.run_configure_scan_and_assert_success, config_path))
+            run_phase("Scan", timed("Scan", self.run_scan_and_assert_success))
+            run_phase("EndScan", timed("EndScan", self.run_end_scan_and_assert_success))
+
+            cycles += 1
+            self.sample_resources(soak_resource_attributes, time.monotonic() - soak_start)
+            self.logger.info(f"Soak cycle {cycles} ({os.path.basename(config_path)}) took {time.monotonic() - cycle_start:.3f}s")
+
+        duration_sec = time.monotonic() - soak_start
+        run_phase("teardown", tear_down_stack)
+
+        self.report_soak("build/reports/soak.json", cycles, duration_sec)
@@ -0,0 +1,128 @@
+"""Per-test collection of performance metrics (timings and counters)"""
+
+import html
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class MetricsCollector:
+    """Collects timings and counters for the currently running test. Any helper can record to it,
+    from any thread; everything recorded is attributed to the test that is running at the time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.nodeid = None
+        self.timings = defaultdict(list)
+        self.counters = defaultdict(int)
+
+    def start_test(self, nodeid: str):
+        """
+        Clear all metrics and start collecting for a new test.
+
+        :param nodeid: pytest node ID of the test
+        """
+        with self._lock:
+            self.nodeid = nodeid
+            self.timings = defaultdict(list)
+            self.counters = defaultdict(int)
+
+    def record_timing(self, name: str, duration_sec: float):
+        """
+        Record one sample of a timing.
+
+        :param name: Name of the timing, e.g. "tango.read_attribute"
+        :param duration_sec: Duration in seconds
+        """
+        with self._lock:
+            self.timings[name].append(duration_sec)
+
+    def increment(self, name: str, count: int = 1):
+        """
+        Increment a counter.
+
+        :param name: Name of the counter
+        :param count: Amount to increment by
+        """
+        with self._lock:
+            self.counters[name] += count
+
+    @contextmanager
+    def timed(self, name: str):
+        """
+        Context manager recording the duration of its body as a timing sample.
+
+        :param name: Name of the timing
+        """
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_timing(name, time.monotonic() - start_time)
+
+    def summary(self) -> dict:
+        """
+        Summarise the metrics collected for the current test.
+
+        :returns: Dict with the counters as-is, and count/total/mean/p95/max statistics for each timing
+        """
+        with self._lock:
+            timings = {name: list(samples) for name, samples in self.timings.items()}
+            counters = dict(self.counters)
+        return {
+            "counters": counters,
+            "timings": {
+                name: {
+                    "count": len(samples),
+                    "total_sec": float(np.sum(samples)),
+                    "mean_sec": float(np.mean(samples)),
+                    "p95_sec": float(np.percentile(samples, 95)),
+                    "max_sec": float(np.max(samples)),
+                }
+                for name, samples in sorted(timings.items())
+            },
+        }
+
+    def html(self) -> str:
+        """
+        Render the metrics collected for the current test as HTML tables, with a sparkline of every timing.
+
+        :returns: HTML string
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self.timings.items()}
+        summary = self.summary()
+        if not summary["counters"] and not summary["timings"]:
+            return "<div>No performance metrics recorded.</div>"
+
+        rows = []
+        for name, stats in summary["timings"].items():
+            rows.append(
+                f"<tr><td>{html.escape(name)}</td><td>{stats['count']}</td><td>{stats['total_sec']:.3f}</td><td>{stats['mean_sec']:.4f}</td>"
+                f"<td>{stats['p95_sec']:.4f}</td><td>{stats['max_sec']:.4f}</td><td>{_sparkline(samples[name])}</td></tr>"
+            )
+        counter_rows = [f"<tr><td>{html.escape(name)}</td><td>{count}</td></tr>" for name, count in sorted(summary["counters"].items())]
+
+        return (
+            "<div><table><tr><th>Timing</th><th>Count</th><th>Total (s)</th><th>Mean (s)</th><th>p95 (s)</th><th>Max (s)</th><th>Samples</th></tr>"
+            + "".join(rows)
+            + "</table>"
+            + ("<table><tr><th>Counter</th><th>Value</th></tr>" + "".join(counter_rows) + "</table>" if counter_rows else "")
+            + "</div>"
+        )
+
+
+def _sparkline(samples: list[float], width: int = 120, height: int = 20) -> str:
+    if len(samples) < 2:
+        return ""
+    peak = max(samples) or 1.0
+    step = width / (len(samples) - 1)
+    points = " ".join(f"{i * step:.1f},{height - (sample / peak) * height:.1f}" for i, sample in enumerate(samples))
+    return f'<svg width="{width}" height="{height}"><polyline fill="none" stroke="#36c" stroke-width="1" points="{points}"/></svg>'
+
+
+metrics = MetricsCollector()
@@ -1,18 +1,101 @@
 """Wrapper class for utilizing Tango.DeviceProxy"""
 
+import fnmatch
 import logging
-import sys
-from typing import Any
+import time
+from typing import Any, Callable, NamedTuple
 
+from metrics import metrics
 from tango import DevFailed, DeviceProxy
+from tracing import tracer
+
+TRANSIENT_ERROR_REASONS = frozenset({"API_DeviceTimedOut", "API_CantConnectToDevice"})
+"""Reasons of DevFailed errors which may succeed if the call is repeated, e.g. from a slow or restarting device server."""
+
+NOT_RECEIVED_ERROR_REASONS = frozenset({"API_CantConnectToDevice"})
+"""Reasons of DevFailed errors which mean the request never reached the device, so even a call with side effects can safely be repeated.
+A timeout doesn't mean the device didn't run the call, so commands and attribute writes aren't retried after one."""
+
+IDEMPOTENT_COMMANDS = frozenset({"getstatus", "state", "status"})
+"""Commands without side effects, which are retried like attribute reads."""
+
+
+class RetryPolicy(NamedTuple):
+    """Timeout and retry behaviour of calls to a device."""
+
+    timeout_sec: float = 3.0
+    """Client-side timeout of each attempt (the default Tango timeout)."""
+    max_retries: int = 2
+    """Number of times a call which failed with a transient error is repeated."""
+    initial_backoff_sec: float = 0.1
+    """Wait before the first retry, doubled for every retry after that."""
+    max_backoff_sec: float = 2.0
+    retry_reasons: frozenset[str] = TRANSIENT_ERROR_REASONS
+    """DevFailed reasons which are retried, for calls without side effects (reads, properties, pings)."""
+    side_effect_retry_reasons: frozenset[str] = NOT_RECEIVED_ERROR_REASONS
+    """DevFailed reasons which are retried, for calls with side effects (commands and attribute writes)."""
+
+    def backoff_sec(self, retry: int) -> float:
+        return min(self.initial_backoff_sec * 2**retry, self.max_backoff_sec)
+
+    def should_retry(self, error: DevFailed, retry: int, idempotent: bool = True) -> bool:
+        retry_reasons = self.retry_reasons if idempotent else self.side_effect_retry_reasons
+        return retry < self.max_retries and any(err.reason in retry_reasons for err in error.args)
+
+
+class RetryPolicies:
+    """Retry policies for calls to devices, configurable per device and per command/attribute.
+    The most specific policy matching a call is used: a (device, name) policy, then a name policy, then a device policy, then the default.
+    Device FQDNs are matched with fnmatch patterns (e.g. "fhs/vcc-all-bands/*"). Names and FQDNs are case-insensitive, as in Tango.
+    """
+
+    def __init__(self, default: RetryPolicy = RetryPolicy()):
+        self.default = default
+        self._policies: list[tuple[str, str | None, RetryPolicy]] = []
+
+    def configure(self, default: RetryPolicy) -> None:
+        """Replace the default policy and clear all others."""
+        self.default = default
+        self._policies = []
+
+    def set_policy(self, policy: RetryPolicy, device_pattern: str = "*", name: str | None = None) -> None:
+        """
+        Set the policy for calls to matching devices.
+
+        :param policy: Policy to use
+        :param device_pattern: fnmatch pattern of the device FQDNs the policy applies to
+        :param name: Command or attribute name the policy applies to, or None for every call
+        """
+        self._policies.append((device_pattern.lower(), name.lower() if name is not None else None, policy))
+
+    def get(self, dev_name: str, name: str | None = None) -> RetryPolicy:
+        """Get the policy for a call to a device; later policies take precedence over earlier ones of the same specificity."""
+        dev_name = dev_name.lower()
+        name = name.lower() if name is not None else None
+        best_policy, best_specificity = self.default, -1
+        for device_pattern, policy_name, policy in self._policies:
+            if policy_name is not None and policy_name != name:
+                continue
+            if not fnmatch.fnmatchcase(dev_name, device_pattern):
+                continue
+            specificity = (2 if policy_name is not None else 0) + (1 if device_pattern != "*" else 0)
+            if specificity >= best_specificity:
+                best_policy, best_specificity = policy, specificity
+        return best_policy
+
+
+retry_policies = RetryPolicies()
 
 
 class PyTangoClientWrapper:
     """Wrapper class for utilizing Tango.DeviceProxy"""
 
     def __init__(self):
+        self.dev_name = None
         self.device_proxy = None
         self.timeout_ms = 3000  # Default Tango timeout
+        self.timeout_override_sec = None
+        self.last_read_errors = {}
         self.logger = logging.getLogger(__name__)
 
     def create_tango_client(self, dev_name: str):
@@ -20,38 +103,79 @@ class PyTangoClientWrapper:
         Creates a device proxy to the specified device.
 
         :param dev_name: Device FQDN to connect to
+        :raises DevFailed: If the device can't be connected to, after retrying any transient errors
         """
+        self.dev_name = dev_name
         try:
-            self.device_proxy = DeviceProxy(dev_name)
-            self.logger.debug(f"Device State : {self.device_proxy.state()}")
-            self.logger.debug(f"Device Status: {self.device_proxy.status()}")
-            self.logger.debug(f"dev_name = {dev_name}")
+            with metrics.timed("tango.connect"):
+                self.device_proxy = DeviceProxy(dev_name)
+            # The proxy only connects to the device when first used, so check it is reachable now
+            self._call("ping", None, lambda: self.device_proxy.ping())
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Device State : {self.device_proxy.state()}")
+                self.logger.debug(f"Device Status: {self.device_proxy.status()}")
+                self.logger.debug(f"dev_name = {dev_name}")
 
         except DevFailed as e:
             self.logger.error(f"Error on DeviceProxy: {e}")
             self.clear_all()
-            sys.exit(str(e))
+            raise
 
     def clear_all(self):
         """
         Reset all class variables to the default setting.
         """
         self.timeout_ms = 3000
+        self.timeout_override_sec = None
         if self.device_proxy is not None:
             self.device_proxy = None
 
-    def set_timeout(self, timeout: int):
+    def set_timeout(self, timeout_sec: float):
         """
-        Set the timeout of the DeviceProxy connection.
+        Set the timeout of the DeviceProxy connection, overriding the retry policy's timeout.
 
-        :param timeout_ms: Timeout in seconds
+        :param timeout_sec: Timeout in seconds
         """
+        self.timeout_override_sec = timeout_sec
         try:
-            self.timeout_ms = timeout * 1000
-            self.device_proxy.set_timeout_millis(self.timeout_ms)
+            self._apply_timeout(timeout_sec)
         except DevFailed as e:
             self.logger.error(str(e))
 
+    def _apply_timeout(self, timeout_sec: float):
+        timeout_ms = int(timeout_sec * 1000)
+        if timeout_ms != self.timeout_ms:
+            self.device_proxy.set_timeout_millis(timeout_ms)
+            self.timeout_ms = timeout_ms
+
+    def _call(self, operation: str, name: str | None, call: Callable[[], Any], idempotent: bool = True) -> Any:
+        """
+        Make a call to the device with the timeout of its retry policy, retrying transient errors with exponential backoff.
+
+        :param operation: Kind of call, e.g. "read_attribute", used to name its metrics
+        :param name: Command or attribute name, if any
+        :param call: Function making the call
+        :param idempotent: Whether the call has no side effects; if it has, it is only retried if it never reached the device
+        :raises DevFailed: If the call fails with a non-transient error, or still fails after every retry
+        :returns: Result of the call
+        """
+        policy = retry_policies.get(self.dev_name, name)
+        self._apply_timeout(self.timeout_override_sec if self.timeout_override_sec is not None else policy.timeout_sec)
+        retry = 0
+        while True:
+            try:
+                with metrics.timed(f"tango.{operation}"), tracer.span(f"{operation} {name or ''}".rstrip(), "tango", device=self.dev_name, name=name, retry=retry):
+                    return call()
+            except DevFailed as e:
+                if not policy.should_retry(e, retry, idempotent):
+                    raise
+                backoff_sec = policy.backoff_sec(retry)
+                retry += 1
+                metrics.increment("tango.retries")
+                metrics.increment(f"tango.retries.{operation}")
+                self.logger.warning(f"{operation} {name or ''} on {self.dev_name} failed with {e.args[0].reason}, retry {retry}/{policy.max_retries} in {backoff_sec:.2f}s")
+                time.sleep(backoff_sec)
+
     def write_attribute(self, attr_name: str, value: Any):
         """
         Write to an attribute.
@@ -60,8 +184,9 @@ class PyTangoClientWrapper:
         :param value: Value to write
         """
         try:
-            self.device_proxy.write_attribute(attr_name, value)
+            self._call("write_attribute", attr_name, lambda: self.device_proxy.write_attribute(attr_name, value), idempotent=False)
         except DevFailed as e:
+            metrics.increment("tango.errors")
             self.logger.error(str(e))
 
     def read_attribute(self, attr_name: str) -> Any:
@@ -72,12 +197,40 @@ class PyTangoClientWrapper:
         :returns: Attribute value or None if an exception occurred
         """
         try:
-            attr_read = self.device_proxy.read_attribute(attr_name)
+            attr_read = self._call("read_attribute", attr_name, lambda: self.device_proxy.read_attribute(attr_name))
             return attr_read.value
         except DevFailed as e:
+            metrics.increment("tango.errors")
             self.logger.error(str(e))
             return None
 
+    def read_attributes(self, attr_names: list[str]) -> dict[str, Any]:
+        """
+        Read several attributes in a single round trip.
+
+        :param attr_names: Attributes to read from
+        :returns: Dict of attribute name to value. Attributes which could not be read map to None,
+            and their errors are stored in last_read_errors (also keyed by attribute name).
+        """
+        self.last_read_errors = {}
+        try:
+            attrs_read = self._call("read_attributes", None, lambda: self.device_proxy.read_attributes(attr_names))
+        except DevFailed as e:
+            metrics.increment("tango.errors")
+            self.logger.error(str(e))
+            self.last_read_errors = {attr_name: e for attr_name in attr_names}
+            return {attr_name: None for attr_name in attr_names}
+
+        values = {}
+        for attr_name, attr_read in zip(attr_names, attrs_read):
+            if attr_read.has_failed:
+                self.last_read_errors[attr_name] = DevFailed(*attr_read.get_err_stack())
+                self.logger.error(f"Failed to read {attr_name}: {self.last_read_errors[attr_name]}")
+                values[attr_name] = None
+            else:
+                values[attr_name] = attr_read.value
+        return values
+
     def command_read_write(self, command_name: str, *args) -> Any:
         """
         Send a command.
@@ -87,8 +240,14 @@ class PyTangoClientWrapper:
         :returns: Command result or None if an exception occurred
         """
         try:
-            return self.device_proxy.command_inout(command_name, *args)
+            return self._call(
+                "command_inout",
+                command_name,
+                lambda: self.device_proxy.command_inout(command_name, *args),
+                idempotent=command_name.lower() in IDEMPOTENT_COMMANDS,
+            )
         except DevFailed as e:
+            metrics.increment("tango.errors")
             self.logger.error(str(e))
             return None
 
@@ -100,7 +259,8 @@ class PyTangoClientWrapper:
         :returns: Property(ies) values or None if an exception occurred
         """
         try:
-            return self.device_proxy.get_property(property_name)
+            return self._call("get_property", property_name, lambda: self.device_proxy.get_property(property_name))
         except DevFailed as e:
+            metrics.increment("tango.errors")
             self.logger.error(str(e))
             return None
@@ -0,0 +1,108 @@
+"""Wrapper class for broadcasting to many devices at once using Tango.Group"""
+
+import logging
+from typing import Any, NamedTuple
+
+from metrics import metrics
+from tango import DevFailed, Group
+from tracing import tracer
+
+
+class GroupReplies(NamedTuple):
+    """Replies gathered from every member of a group."""
+
+    values: dict[str, Any]
+    """Reply value for each member which replied successfully, keyed by device FQDN."""
+    errors: dict[str, DevFailed]
+    """Error for each member which failed or timed out, keyed by device FQDN."""
+
+
+class PyTangoGroupWrapper:
+    """Wrapper class for broadcasting commands and attribute reads to many devices using Tango.Group"""
+
+    def __init__(self, name: str, dev_names: list[str] | None = None):
+        self.group = Group(name)
+        self.timeout_ms = 3000  # Default Tango timeout
+        self.member_timeouts_ms = {}
+        self.logger = logging.getLogger(__name__)
+        if dev_names:
+            self.add(dev_names)
+
+    def add(self, dev_names: list[str]):
+        """
+        Add devices to the group.
+
+        :param dev_names: Device FQDNs to add
+        """
+        for dev_name in dev_names:
+            self.group.add(dev_name)
+
+    def set_timeout(self, timeout_sec: float):
+        """
+        Set the timeout of every member of the group.
+
+        :param timeout_sec: Timeout in seconds
+        """
+        self.timeout_ms = int(timeout_sec * 1000)
+        self.member_timeouts_ms = {}
+        self.group.set_timeout_millis(self.timeout_ms)
+
+    def set_member_timeout(self, dev_name: str, timeout_sec: float):
+        """
+        Set the timeout of a single member of the group.
+
+        :param dev_name: Device FQDN of the member
+        :param timeout_sec: Timeout in seconds
+        """
+        self.member_timeouts_ms[dev_name] = int(timeout_sec * 1000)
+        self.group.get_device(dev_name).set_timeout_millis(self.member_timeouts_ms[dev_name])
+
+    def command_inout(self, command_name: str, *args) -> GroupReplies:
+        """
+        Send a command to every member asynchronously, then gather the replies.
+
+        :param command_name: Name of the command
+        :param args: Input argument (at most one, sent to every member)
+        :returns: Replies from every member
+        """
+        try:
+            with metrics.timed("tango.group.command_inout"), tracer.span(f"group command_inout {command_name}", "tango", group=self.group.get_name(), name=command_name):
+                request_id = self.group.command_inout_asynch(command_name, *args)
+                replies = self.group.command_inout_reply(request_id, self._reply_timeout_ms())
+        except DevFailed as e:
+            self.logger.error(str(e))
+            return GroupReplies({}, {dev_name: e for dev_name in self.group.get_device_list()})
+        return self._gather(f"command {command_name}", replies, lambda reply: reply.get_data())
+
+    def read_attribute(self, attr_name: str) -> GroupReplies:
+        """
+        Read an attribute from every member asynchronously, then gather the replies.
+
+        :param attr_name: Attribute to read from
+        :returns: Replies from every member
+        """
+        try:
+            with metrics.timed("tango.group.read_attribute"), tracer.span(f"group read_attribute {attr_name}", "tango", group=self.group.get_name(), name=attr_name):
+                request_id = self.group.read_attribute_asynch(attr_name)
+                replies = self.group.read_attribute_reply(request_id, self._reply_timeout_ms())
+        except DevFailed as e:
+            self.logger.error(str(e))
+            return GroupReplies({}, {dev_name: e for dev_name in self.group.get_device_list()})
+        return self._gather(f"attribute {attr_name}", replies, lambda reply: reply.get_data().value)
+
+    def _reply_timeout_ms(self) -> int:
+        # Wait as long as the slowest member is allowed to take
+        return max([self.timeout_ms, *self.member_timeouts_ms.values()])
+
+    def _gather(self, description: str, replies, get_value) -> GroupReplies:
+        values = {}
+        errors = {}
+        for reply in replies:
+            dev_name = reply.dev_name()
+            if reply.has_failed():
+                metrics.increment("tango.errors")
+                errors[dev_name] = DevFailed(*reply.get_err_stack())
+                self.logger.error(f"{description} failed on {dev_name}: {errors[dev_name]}")
+            else:
+                values[dev_name] = get_value(reply)
+        return GroupReplies(values, errors)
@@ -0,0 +1,551 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, NamedTuple
+
+import pytest
+from base_tango_test_class import BaseTangoTestClass
+from config_registry import ConfigRegistry
+from connection_utils import AsyncEmulatorAPIService, AsyncInjectorAPIService, DeviceKey, EmulatorAPIService, EmulatorIPBlockId
+from scan_utils import assert_gains_match
+from ska_tango_base.control_model import AdminMode, CommunicationStatus, ObsState
+from status_snapshot import StatusSnapshot
+from tango import DevState
+
+VALID_CONFIGURE_SCAN_PATHS = [f"test_parameters/configure_scan_valid_{i}.json" for i in range(1, 7)]
+
+
+class CommandDispatch(NamedTuple):
+    """Record of the last command sent to an all-bands device."""
+
+    fhs_vcc_idx: int
+    command_name: str
+    result: Any
+    dispatch_time: datetime
+    """Wall-clock time at which the command was sent."""
+    latency_sec: float
+    """Time taken for the command call itself to return."""
+
+
+class ScanSequenceTestClass(BaseTangoTestClass):
+    """Base class for tests driving the all-bands observing lifecycle, with helpers for each command."""
+
+    @pytest.fixture(autouse=True)
+    def use_config_registry(self, config_registry: ConfigRegistry) -> None:
+        self.config_registry = config_registry
+
+    @pytest.fixture(autouse=True)
+    def reset_all_bands(self, initialize_with_indices) -> None:
+        all_bands_group = self.create_group(DeviceKey.ALL_BANDS)
+        all_bands_group.command_inout("Init")
+        yield
+        all_bands_group.command_inout("Init")
+
+    @pytest.fixture()
+    def reset_wib_registers(self, initialize_with_indices, inject_url, config_registry: ConfigRegistry) -> None:
+        reset_event_json = config_registry.parsed("test_parameters/injection_reset_registers_1.json")
+
+        async def reset_all():
+            await asyncio.gather(
+                *(
+                    AsyncInjectorAPIService.send_events_to_ip_block(inject_url, fhs_vcc_idx, EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER, reset_event_json)
+                    for fhs_vcc_idx in self.loaded_idxs
+                )
+            )
+
+        asyncio.run(reset_all())
+        yield
+        asyncio.run(reset_all())
+
+    def post_initialize(self) -> None:
+        # Keyed by FHS-VCC index, since the stacks' commands may be sent from different threads (see StackPhaseRunner)
+        self.last_dispatches: dict[int, CommandDispatch] = {}
+        for i in self.loaded_idxs:
+            self.event_store.subscribe_event(self.fqdns[DeviceKey.ETHERNET][i], "obsState")
+            self.event_store.subscribe_event(self.fqdns[DeviceKey.PACKET_VALIDATION][i], "obsState")
+            self.event_store.subscribe_event(self.fqdns[DeviceKey.WIDEBAND_INPUT_BUFFER][i], "obsState")
+            self.event_store.subscribe_event(self.fqdns[DeviceKey.ALL_BANDS][i], "longRunningCommandsInQueue")
+            self.event_store.subscribe_event(self.fqdns[DeviceKey.ALL_BANDS][i], "longRunningCommandInProgress")
+
+    def wait_for_emulator_states_and_assert_success(self, fhs_vcc_idx: int, states: dict[EmulatorIPBlockId, str], phase: str) -> None:
+        results = EmulatorAPIService.wait_for_states(self.emulator_urls[fhs_vcc_idx], states)
+
+        for ip_block, result in results.items():
+            self.logger.debug(f"{ip_block.value} {fhs_vcc_idx} state {phase}: {result.state} (took {result.elapsed_sec:.3f}s)")
+
+        for ip_block, result in results.items():
+            assert result.success, f"{ip_block.value} {fhs_vcc_idx} did not reach {states[ip_block]} {phase}, last state: {result.state}"
+
+    def reset_emulators_and_assert_successful(self, fhs_vcc_idx: int) -> None:
+        emulator_url = self.emulator_urls[fhs_vcc_idx]
+
+        async def recover_all():
+            await asyncio.gather(*(AsyncEmulatorAPIService.post(emulator_url, ip_block, route="recover") for ip_block in EmulatorIPBlockId))
+
+        asyncio.run(recover_all())
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.ETHERNET_200G: "RESET",
+                EmulatorIPBlockId.PACKET_VALIDATION: "RESET",
+                EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER: "RESET",
+            },
+            "after reset",
+        )
+
+        self.logger.info(f"Emulators were reset successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def set_admin_mode_and_assert_change_events_occurred(self, fhs_vcc_idx: int, admin_mode: AdminMode) -> None:
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_proxy.write_attribute("adminMode", admin_mode)
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+
+        self.logger.debug(f"allbands OpState after setting to {admin_mode.name}: {all_bands_opState}")
+
+        match admin_mode:
+            case AdminMode.ONLINE:
+                assert all_bands_opState == DevState.ON
+
+                self.logger.info("Waiting for CommunicationState to be ESTABLISHED.")
+                self.events.assert_change_event_occurred(
+                    device_name=all_bands_fqdn,
+                    attribute_name="communicationState",
+                    attribute_value=CommunicationStatus.ESTABLISHED,
+                )
+                self.logger.info(f"CommunicationState successfully set to ESTABLISHED for FHS-VCC {fhs_vcc_idx}.")
+
+            case AdminMode.OFFLINE:
+                all_bands_adminMode = all_bands_proxy.read_attribute("adminMode")
+
+                self.logger.info("Waiting for CommunicationState to be DISABLED.")
+                self.events.assert_change_event_occurred(
+                    device_name=all_bands_fqdn,
+                    attribute_name="communicationState",
+                    attribute_value=CommunicationStatus.DISABLED,
+                )
+                self.logger.info(f"CommunicationState successfully set to DISABLED for FHS-VCC {fhs_vcc_idx}.")
+            case _:
+                self.logger.warn("Unsupported AdminMode: {admin_mode.name}")
+
+        all_bands_adminMode = all_bands_proxy.read_attribute("adminMode")
+        self.logger.debug(f"allbands AdminMode after setting to {admin_mode.name}: {all_bands_adminMode}")
+
+        assert all_bands_adminMode == admin_mode
+
+        self.logger.info(f"AdminMode successfully set to {admin_mode.name} for FHS-VCC {fhs_vcc_idx}.")
+
+    def get_configure_scan_config(self, config_path: str) -> tuple[str, dict]:
+        config_file = self.config_registry.get(config_path)
+        assert len(config_file.raw) > 0
+        return config_file.raw, config_file.parsed
+
+    def take_status_snapshot(self, fhs_vcc_idxs: list[int], phase: str) -> StatusSnapshot:
+        status_snapshot = StatusSnapshot.take(self.proxies, fhs_vcc_idxs)
+        for (fhs_vcc_idx, device_key), status in status_snapshot.statuses.items():
+            self.logger.debug(f"{device_key.value} {fhs_vcc_idx} status {phase}: {status}")
+        return status_snapshot
+
+    def send_all_bands_command(self, fhs_vcc_idx: int, command_name: str, *args) -> Any:
+        dispatch_time = datetime.now()
+        start_time = time.monotonic()
+        result = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx].command_read_write(command_name, *args)
+        self.last_dispatches[fhs_vcc_idx] = CommandDispatch(fhs_vcc_idx, command_name, result, dispatch_time, time.monotonic() - start_time)
+        return result
+
+    def run_configure_scan(self, fhs_vcc_idx: int, config_str: str) -> Any:
+        configure_scan_result = self.send_all_bands_command(fhs_vcc_idx, "ConfigureScan", config_str)
+        self.logger.debug(f"configure scan result: {configure_scan_result}")
+
+        return configure_scan_result
+
+    def run_configure_scan_and_assert_success(self, fhs_vcc_idx: int, config_path: str) -> Any:
+        config_str, _ = self.get_configure_scan_config(config_path)
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        all_bands_attrs = all_bands_proxy.read_attributes(["obsState", "frequencyBand", "frequencyBandOffset"])
+        all_bands_obsState = all_bands_attrs["obsState"]
+        all_bands_frequencyBand = all_bands_attrs["frequencyBand"]
+        all_bands_frequencyBandOffset = all_bands_attrs["frequencyBandOffset"]
+        status_snapshot = self.take_status_snapshot([fhs_vcc_idx], "before ConfigureScan")
+
+        self.logger.debug(f"allbands ObsState before ConfigureScan: {all_bands_obsState}")
+        self.logger.debug(f"allbands frequencyBand before ConfigureScan: {all_bands_frequencyBand}")
+        self.logger.debug(f"allbands frequencyBandOffset before ConfigureScan: {all_bands_frequencyBandOffset}")
+
+        configure_scan_result = self.run_configure_scan(fhs_vcc_idx, config_str)
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.CONFIGURING,
+        )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="longRunningCommandResult",
+            attribute_value=(
+                f"{configure_scan_result[1][0]}",
+                '[0, "ConfigureScan completed OK"]',
+            ),
+        )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.READY,
+        )
+
+        all_bands_attrs = all_bands_proxy.read_attributes(["obsState", "frequencyBand", "frequencyBandOffset"])
+        all_bands_obsState = all_bands_attrs["obsState"]
+        all_bands_frequencyBand = all_bands_attrs["frequencyBand"]
+        all_bands_frequencyBandOffset = all_bands_attrs["frequencyBandOffset"]
+        status_snapshot = self.take_status_snapshot([fhs_vcc_idx], "after ConfigureScan")
+
+        self.logger.debug(f"allbands ObsState after ConfigureScan: {all_bands_obsState}")
+        self.logger.debug(f"allbands frequencyBand after ConfigureScan: {all_bands_frequencyBand}")
+        self.logger.debug(f"allbands frequencyBandOffset after ConfigureScan: {all_bands_frequencyBandOffset}")
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.VCC_123: "ACTIVE",
+                EmulatorIPBlockId.WIDEBAND_FREQ_SHIFTER: "ACTIVE",
+                EmulatorIPBlockId.FREQ_SLICE_SELECTION: "ACTIVE",
+            },
+            "after ConfigureScan",
+        )
+
+        expected = self.config_registry.expectations(config_path)
+
+        assert all_bands_frequencyBand == expected.frequency_band
+        assert len(all_bands_frequencyBandOffset) == 2
+        assert all_bands_frequencyBandOffset[0] == expected.frequency_band_offset[0]
+        assert all_bands_frequencyBandOffset[1] == expected.frequency_band_offset[1]
+
+        assert_gains_match({fhs_vcc_idx: expected.gains}, {fhs_vcc_idx: status_snapshot.get(fhs_vcc_idx, DeviceKey.VCC_123)})
+        assert status_snapshot.get(fhs_vcc_idx, DeviceKey.WIDEBAND_FREQ_SHIFTER).get("shift_frequency") == expected.shift_frequency
+        assert status_snapshot.get(fhs_vcc_idx, DeviceKey.FREQ_SLICE_SELECTION).get("band_select") == expected.band_select
+
+        assert status_snapshot.get(fhs_vcc_idx, DeviceKey.PACKETIZER).get("vid_register") == expected.packetizer_vid
+
+        self.logger.info(f"ConfigureScan completed successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_configure_scan_and_assert_failure(self, fhs_vcc_idx: int, config_path: str, expected_code: int = 5, expected_error_msg: str | None = None) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        config_str, _ = self.get_configure_scan_config(config_path)
+
+        all_bands_attrs = all_bands_proxy.read_attributes(["obsState", "frequencyBand", "frequencyBandOffset"])
+        all_bands_obsState = all_bands_attrs["obsState"]
+        all_bands_frequencyBand_before = all_bands_attrs["frequencyBand"]
+        all_bands_frequencyBandOffset_before = all_bands_attrs["frequencyBandOffset"]
+        status_snapshot_before = self.take_status_snapshot([fhs_vcc_idx], "before ConfigureScan")
+
+        self.logger.debug(f"allbands ObsState before ConfigureScan: {all_bands_obsState}")
+        self.logger.debug(f"allbands frequencyBand before ConfigureScan: {all_bands_frequencyBand_before}")
+        self.logger.debug(f"allbands frequencyBandOffset before ConfigureScan: {all_bands_frequencyBandOffset_before}")
+
+        configure_scan_result = self.run_configure_scan(fhs_vcc_idx, config_str)
+
+        if expected_error_msg is not None:
+            self.events.assert_change_event_occurred(
+                device_name=all_bands_fqdn,
+                attribute_name="longRunningCommandResult",
+                attribute_value=(
+                    f"{configure_scan_result[1][0]}",
+                    f'[{expected_code}, "{expected_error_msg}"]',
+                ),
+            )
+
+        else:
+            self.events.assert_change_event_occurred(
+                device_name=all_bands_fqdn,
+                attribute_name="longRunningCommandResult",
+                custom_matcher=lambda event: event.attribute_value[1].strip("[]").split(",")[0].strip() == f"{expected_code}",
+            )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.IDLE,
+        )
+
+        all_bands_attrs = all_bands_proxy.read_attributes(["obsState", "frequencyBand", "frequencyBandOffset"])
+        all_bands_obsState = all_bands_attrs["obsState"]
+        all_bands_frequencyBand_after = all_bands_attrs["frequencyBand"]
+        all_bands_frequencyBandOffset_after = all_bands_attrs["frequencyBandOffset"]
+        status_snapshot_after = self.take_status_snapshot([fhs_vcc_idx], "after ConfigureScan")
+
+        self.logger.debug(f"allbands ObsState after ConfigureScan: {all_bands_obsState}")
+        self.logger.debug(f"allbands frequencyBand after ConfigureScan: {all_bands_frequencyBand_after}")
+        self.logger.debug(f"allbands frequencyBandOffset after ConfigureScan: {all_bands_frequencyBandOffset_after}")
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.VCC_123: "ACTIVE",
+                EmulatorIPBlockId.WIDEBAND_FREQ_SHIFTER: "ACTIVE",
+                EmulatorIPBlockId.FREQ_SLICE_SELECTION: "ACTIVE",
+            },
+            "after ConfigureScan",
+        )
+
+        assert all_bands_frequencyBand_after == all_bands_frequencyBand_before
+        assert len(all_bands_frequencyBandOffset_after) == 2
+        assert all_bands_frequencyBandOffset_after[0] == all_bands_frequencyBandOffset_before[0]
+        assert all_bands_frequencyBandOffset_after[1] == all_bands_frequencyBandOffset_before[1]
+
+        status_changes = status_snapshot_before.diff(
+            status_snapshot_after,
+            fields={
+                DeviceKey.VCC_123: ["gains"],
+                DeviceKey.WIDEBAND_FREQ_SHIFTER: ["shift_frequency"],
+                DeviceKey.FREQ_SLICE_SELECTION: ["band_select"],
+                DeviceKey.PACKETIZER: ["vid_register"],
+            },
+        )
+        assert not status_changes, f"Status changed after failed ConfigureScan: {status_changes}"
+
+        self.logger.info(f"ConfigureScan failed as expected for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_scan_and_assert_success(self, fhs_vcc_idx: int) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        eth_proxy = self.proxies[DeviceKey.ETHERNET][fhs_vcc_idx]
+        pv_proxy = self.proxies[DeviceKey.PACKET_VALIDATION][fhs_vcc_idx]
+        wib_proxy = self.proxies[DeviceKey.WIDEBAND_INPUT_BUFFER][fhs_vcc_idx]
+        emulator_url = self.emulator_urls[fhs_vcc_idx]
+
+        eth_obsState = eth_proxy.read_attribute("obsState")
+        pv_obsState = pv_proxy.read_attribute("obsState")
+        wib_obsState = wib_proxy.read_attribute("obsState")
+
+        self.logger.debug(f"Ethernet obsState before Scan: {eth_obsState}")
+        self.logger.debug(f"Packet Validation obsState before Scan: {pv_obsState}")
+        self.logger.debug(f"WIB obsState before Scan: {wib_obsState}")
+
+        eth_state = EmulatorAPIService.get(emulator_url, EmulatorIPBlockId.ETHERNET_200G, "state")
+        pv_state = EmulatorAPIService.get(emulator_url, EmulatorIPBlockId.PACKET_VALIDATION, "state")
+        wib_state = EmulatorAPIService.get(emulator_url, EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER, "state")
+
+        self.logger.debug(f"eth state before Scan: {eth_state}")
+        self.logger.debug(f"pv state before Scan: {pv_state}")
+        self.logger.debug(f"wib state before Scan: {wib_state}")
+
+        scan_result = self.send_all_bands_command(fhs_vcc_idx, "Scan", 0)
+
+        self.events.assert_change_event_occurred(
+            device_name=self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx],
+            attribute_name="longRunningCommandResult",
+            attribute_value=(
+                f"{scan_result[1][0]}",
+                '[0, "Scan completed OK"]',
+            ),
+        )
+
+        for device_key in [DeviceKey.ALL_BANDS, DeviceKey.ETHERNET, DeviceKey.PACKET_VALIDATION, DeviceKey.WIDEBAND_INPUT_BUFFER]:
+            self.events.assert_change_event_occurred(
+                device_name=self.fqdns[device_key][fhs_vcc_idx],
+                attribute_name="obsState",
+                attribute_value=ObsState.SCANNING,
+            )
+
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+        assert all_bands_opState == DevState.ON
+
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+        eth_obsState = eth_proxy.read_attribute("obsState")
+        pv_obsState = pv_proxy.read_attribute("obsState")
+        wib_obsState = wib_proxy.read_attribute("obsState")
+
+        self.logger.debug(f"allbands obsState after Scan: {all_bands_obsState}")
+        self.logger.debug(f"Ethernet obsState after Scan: {eth_obsState}")
+        self.logger.debug(f"Packet Validation obsState after Scan: {pv_obsState}")
+        self.logger.debug(f"WIB obsState after Scan: {wib_obsState}")
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.ETHERNET_200G: "LINK",
+                EmulatorIPBlockId.PACKET_VALIDATION: "ENABLED",
+                EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER: "ENABLED",
+            },
+            "after Scan",
+        )
+
+        self.logger.info(f"Scan completed successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_end_scan_and_assert_success(self, fhs_vcc_idx: int) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        end_scan_result = self.send_all_bands_command(fhs_vcc_idx, "EndScan")
+
+        self.events.assert_change_event_occurred(
+            device_name=self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx],
+            attribute_name="longRunningCommandResult",
+            attribute_value=(
+                f"{end_scan_result[1][0]}",
+                '[0, "EndScan completed OK"]',
+            ),
+        )
+
+        for device_key in [DeviceKey.ALL_BANDS, DeviceKey.ETHERNET, DeviceKey.PACKET_VALIDATION, DeviceKey.WIDEBAND_INPUT_BUFFER]:
+            self.events.assert_change_event_occurred(
+                device_name=self.fqdns[device_key][fhs_vcc_idx],
+                attribute_name="obsState",
+                attribute_value=ObsState.READY,
+            )
+
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+        self.logger.debug(f"allbands obsState after EndScan: {all_bands_obsState}")
+
+        eth_obsState = self.proxies[DeviceKey.ETHERNET][fhs_vcc_idx].read_attribute("obsState")
+        pv_obsState = self.proxies[DeviceKey.PACKET_VALIDATION][fhs_vcc_idx].read_attribute("obsState")
+        wib_obsState = self.proxies[DeviceKey.WIDEBAND_INPUT_BUFFER][fhs_vcc_idx].read_attribute("obsState")
+
+        self.logger.debug(f"Ethernet obsState after EndScan: {eth_obsState}")
+        self.logger.debug(f"Packet Validation obsState after EndScan: {pv_obsState}")
+        self.logger.debug(f"WIB obsState after EndScan: {wib_obsState}")
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.ETHERNET_200G: "RESET",
+                EmulatorIPBlockId.PACKET_VALIDATION: "RESET",
+                EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER: "READY",
+            },
+            "after EndScan",
+        )
+
+        self.logger.info(f"EndScan completed successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_abort_and_assert_success(self, fhs_vcc_idx: int) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+        all_bands_lrcQ = all_bands_proxy.read_attribute("longRunningCommandsInQueue")
+        all_bands_lrcP = all_bands_proxy.read_attribute("longRunningCommandInProgress")
+
+        self.logger.debug(f"allbands opState before AbortCommands: {all_bands_opState}")
+        self.logger.debug(f"allbands obsState before AbortCommands: {all_bands_obsState}")
+        self.logger.debug(f"allbands LRC in Q before AbortCommands: {all_bands_lrcQ}")
+        self.logger.debug(f"allbands LRC in Prog before AbortCommands: {all_bands_lrcP}")
+
+        self.send_all_bands_command(fhs_vcc_idx, "AbortCommands")
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.ABORTED,
+        )
+
+        for device_key in [DeviceKey.ALL_BANDS, DeviceKey.ETHERNET, DeviceKey.PACKET_VALIDATION, DeviceKey.WIDEBAND_INPUT_BUFFER]:
+            self.events.assert_change_event_occurred(
+                device_name=self.fqdns[device_key][fhs_vcc_idx],
+                attribute_name="obsState",
+                attribute_value=ObsState.READY,
+            )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="longRunningCommandsInQueue",
+            attribute_value=(),
+        )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="longRunningCommandInProgress",
+            attribute_value=(),
+        )
+
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+        all_bands_lrcQ = all_bands_proxy.read_attribute("longRunningCommandsInQueue")
+        all_bands_lrcP = all_bands_proxy.read_attribute("longRunningCommandInProgress")
+
+        self.logger.debug(f"allbands opState after AbortCommands: {all_bands_opState}")
+        self.logger.debug(f"allbands obsState after AbortCommands: {all_bands_obsState}")
+        self.logger.debug(f"allbands LRC in Q after AbortCommands: {all_bands_lrcQ}")
+        self.logger.debug(f"allbands LRC in Prog after AbortCommands: {all_bands_lrcP}")
+
+        self.logger.info(f"AbortCommands completed successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_go_to_idle_and_assert_success(self, fhs_vcc_idx: int) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        go_to_idle_result = self.send_all_bands_command(fhs_vcc_idx, "GoToIdle")
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="longRunningCommandResult",
+            attribute_value=(
+                f"{go_to_idle_result[1][0]}",
+                '[0, "GoToIdle completed OK"]',
+            ),
+        )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.IDLE,
+        )
+
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+
+        self.logger.debug(f"allbands opState after GoToIdle: {all_bands_opState}")
+        self.logger.debug(f"allbands obsState after GoToIdle: {all_bands_obsState}")
+
+        self.logger.info(f"GoToIdle completed successfully for FHS-VCC {fhs_vcc_idx}.")
+
+    def run_obsreset_and_assert_success(self, fhs_vcc_idx: int) -> Any:
+
+        all_bands_proxy = self.proxies[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+        all_bands_fqdn = self.fqdns[DeviceKey.ALL_BANDS][fhs_vcc_idx]
+
+        obsreset_result = self.send_all_bands_command(fhs_vcc_idx, "ObsReset")
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="longRunningCommandResult",
+            attribute_value=(
+                f"{obsreset_result[1][0]}",
+                '[0, "ObsReset completed OK"]',
+            ),
+        )
+
+        self.events.assert_change_event_occurred(
+            device_name=all_bands_fqdn,
+            attribute_name="obsState",
+            attribute_value=ObsState.IDLE,
+        )
+
+        self.wait_for_emulator_states_and_assert_success(
+            fhs_vcc_idx,
+            {
+                EmulatorIPBlockId.ETHERNET_200G: "RESET",
+                EmulatorIPBlockId.PACKET_VALIDATION: "RESET",
+                EmulatorIPBlockId.WIDEBAND_INPUT_BUFFER: "READY",
+            },
+            "after ObsReset",
+        )
+
+        all_bands_opState = all_bands_proxy.read_attribute("State")
+        all_bands_obsState = all_bands_proxy.read_attribute("obsState")
+
+        self.logger.debug(f"allbands opState after GoToIdle: {all_bands_opState}")
+        self.logger.debug(f"allbands obsState after GoToIdle: {all_bands_obsState}")
+
+        self.logger.info(f"ObsReset completed successfully for FHS-VCC {fhs_vcc_idx}.")
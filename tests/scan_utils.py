@@ -1,3 +1,7 @@
+from collections.abc import Mapping
+
+import numpy as np
+
 frequency_band_map = {
     "1": 0,
     "2": 1,
@@ -6,3 +10,45 @@ frequency_band_map = {
     "5a": 4,
     "5b": 5,
 }
+
+
+def find_gain_mismatches(
+    expected_gains: Mapping[int, np.ndarray],
+    vcc_123_statuses: Mapping[int, dict],
+    rtol: float = 1e-6,
+    atol: float = 1e-12,
+) -> dict[int, np.ndarray]:
+    """Compare the gains reported in the VCC-123 GetStatus of any number of stacks against their expected gains, all in one go.
+    Returns the indices of the mismatched gains of each stack with any mismatches (a missing or extra gain counts as a mismatch).
+    The default tolerances match pytest.approx.
+    """
+    fhs_vcc_idxs = list(expected_gains)
+    reported_gains = {i: np.fromiter((gain["gain"] for gain in vcc_123_statuses[i].get("gains", [])), dtype=float) for i in fhs_vcc_idxs}
+    width = max((max(len(expected_gains[i]), len(reported_gains[i])) for i in fhs_vcc_idxs), default=0)
+
+    # One row per stack, padded with NaN (which never compares equal) so stacks with missing or extra gains mismatch
+    expected = np.full((len(fhs_vcc_idxs), width), np.nan)
+    reported = np.full((len(fhs_vcc_idxs), width), np.nan)
+    for row, fhs_vcc_idx in enumerate(fhs_vcc_idxs):
+        expected[row, : len(expected_gains[fhs_vcc_idx])] = expected_gains[fhs_vcc_idx]
+        reported[row, : len(reported_gains[fhs_vcc_idx])] = reported_gains[fhs_vcc_idx]
+    padding = np.isnan(expected) & np.isnan(reported)
+
+    mismatched = ~(np.isclose(reported, expected, rtol=rtol, atol=atol) | padding)
+    return {fhs_vcc_idxs[row]: np.flatnonzero(mismatched[row]) for row in np.flatnonzero(mismatched.any(axis=1))}
+
+
+def assert_gains_match(expected_gains: Mapping[int, np.ndarray], vcc_123_statuses: Mapping[int, dict]) -> None:
+    """Assert that the VCC-123 gains of every stack match their expected gains, listing every mismatch if not."""
+    mismatches = find_gain_mismatches(expected_gains, vcc_123_statuses)
+    if not mismatches:
+        return
+    messages = []
+    for fhs_vcc_idx, indices in mismatches.items():
+        reported = vcc_123_statuses[fhs_vcc_idx].get("gains", [])
+        details = ", ".join(
+            f"[{i}] expected {expected_gains[fhs_vcc_idx][i] if i < len(expected_gains[fhs_vcc_idx]) else None}, got {reported[i]['gain'] if i < len(reported) else None}"
+            for i in indices[:10]
+        )
+        messages.append(f"FHS-VCC {fhs_vcc_idx}: {len(indices)} mismatched gains: {details}{', ...' if len(indices) > 10 else ''}")
+    raise AssertionError("VCC-123 gains do not match the config:\n" + "\n".join(messages))
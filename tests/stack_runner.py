@@ -0,0 +1,60 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging import Logger
+from typing import Any, Callable
+
+
+class StackPhaseRunner:
+    """Runs each phase of a multi-stack test on every FHS-VCC stack, either one stack at a time
+    or concurrently (at most max_workers stacks at a time). Stacks are dispatched in a new random order for every phase, and
+    a phase only returns once every stack has finished it (i.e. there is a barrier between phases).
+    """
+
+    def __init__(self, fhs_vcc_idxs: list[int], parallel: bool, logger: Logger, max_workers: int = 64):
+        self.fhs_vcc_idxs = fhs_vcc_idxs
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.logger = logger
+        self.phase_durations: dict[str, float] = {}
+        """Wall-clock time taken by each phase, across all stacks."""
+        self.stack_latencies: dict[str, dict[int, float]] = {}
+        """Time taken by each stack within each phase."""
+
+    def run(self, phase: str, action: Callable[[int], Any]) -> dict[int, Any]:
+        """Run the given action for every stack and return the results, keyed by FHS-VCC index.
+        If any stack fails, the first exception (in dispatch order) is raised once all stacks have finished.
+        """
+        dispatch_order = random.sample(self.fhs_vcc_idxs, k=len(self.fhs_vcc_idxs))
+        latencies = self.stack_latencies.setdefault(phase, {})
+
+        def timed_action(fhs_vcc_idx: int) -> Any:
+            start_time = time.monotonic()
+            try:
+                return action(fhs_vcc_idx)
+            finally:
+                latencies[fhs_vcc_idx] = time.monotonic() - start_time
+
+        start_time = time.monotonic()
+        if self.parallel:
+            with ThreadPoolExecutor(max_workers=max(min(len(dispatch_order), self.max_workers), 1), thread_name_prefix=f"stack-{phase}") as executor:
+                futures = {fhs_vcc_idx: executor.submit(timed_action, fhs_vcc_idx) for fhs_vcc_idx in dispatch_order}
+                wait(futures.values())
+            self.phase_durations[phase] = time.monotonic() - start_time
+            results = {fhs_vcc_idx: future.result() for fhs_vcc_idx, future in futures.items()}
+        else:
+            results = {fhs_vcc_idx: timed_action(fhs_vcc_idx) for fhs_vcc_idx in dispatch_order}
+            self.phase_durations[phase] = time.monotonic() - start_time
+
+        self.logger.info(
+            f"Phase '{phase}' took {self.phase_durations[phase]:.3f}s ({'parallel' if self.parallel else 'sequential'}, order {dispatch_order}): "
+            + ", ".join(f"FHS-VCC {i}: {latencies[i]:.3f}s" for i in dispatch_order)
+        )
+        return results
+
+    def log_summary(self) -> None:
+        """Log the aggregate and per-stack latency of every phase run so far."""
+        self.logger.info(f"Phase latency summary ({'parallel' if self.parallel else 'sequential'} mode):")
+        for phase, duration in self.phase_durations.items():
+            latencies = self.stack_latencies[phase].values()
+            self.logger.info(f"    {phase}: total {duration:.3f}s, per stack min {min(latencies):.3f}s / mean {sum(latencies) / len(latencies):.3f}s / max {max(latencies):.3f}s")
@@ -0,0 +1,72 @@
+import json
+import math
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from connection_utils import DeviceKey
+from pytango_client_wrapper import PyTangoClientWrapper
+
+SIGNAL_CHAIN_DEVICE_KEYS = [
+    DeviceKey.VCC_123,
+    DeviceKey.WIDEBAND_FREQ_SHIFTER,
+    DeviceKey.FREQ_SLICE_SELECTION,
+    DeviceKey.PACKETIZER,
+]
+
+
+def _values_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-12)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_values_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_values_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class StatusSnapshot:
+    """Parsed GetStatus results of a set of devices across one or more FHS-VCC stacks, taken at one point in time."""
+
+    def __init__(self, statuses: dict[tuple[int, DeviceKey], dict]):
+        self.statuses = statuses
+
+    @classmethod
+    def take(
+        cls,
+        proxies: Mapping[DeviceKey, Mapping[int, PyTangoClientWrapper]],
+        fhs_vcc_idxs: list[int],
+        device_keys: list[DeviceKey] = SIGNAL_CHAIN_DEVICE_KEYS,
+        max_workers: int = 64,
+    ) -> "StatusSnapshot":
+        """Call GetStatus concurrently (at most max_workers at a time) on the given devices of the given stacks, and parse the results."""
+        status_keys = [(i, k) for i in fhs_vcc_idxs for k in device_keys]
+        if not status_keys:
+            return cls({})
+
+        def get_status(status_key: tuple[int, DeviceKey]) -> dict:
+            fhs_vcc_idx, device_key = status_key
+            return json.loads(proxies[device_key][fhs_vcc_idx].command_read_write("GetStatus", False)[1][0])
+
+        with ThreadPoolExecutor(max_workers=min(len(status_keys), max_workers), thread_name_prefix="status-snapshot") as executor:
+            return cls(dict(zip(status_keys, executor.map(get_status, status_keys))))
+
+    def get(self, fhs_vcc_idx: int, device_key: DeviceKey) -> dict:
+        """Get the parsed status of a single device."""
+        return self.statuses[(fhs_vcc_idx, device_key)]
+
+    def diff(self, other: "StatusSnapshot", fields: dict[DeviceKey, list[str]] | None = None) -> dict[tuple[int, DeviceKey], dict[str, tuple[Any, Any]]]:
+        """Compare this snapshot against a later one. Returns the (before, after) values of every status field which changed,
+        keyed by (index, device key) and then field name. Devices without any changes are omitted.
+        If fields is given, only those fields of those devices are compared. Floats are compared approximately.
+        """
+        changes = {}
+        for status_key, status in self.statuses.items():
+            if fields is not None and status_key[1] not in fields:
+                continue
+            other_status = other.statuses.get(status_key, {})
+            field_names = fields[status_key[1]] if fields is not None else status.keys() | other_status.keys()
+            changed = {field: (status.get(field), other_status.get(field)) for field in field_names if not _values_equal(status.get(field), other_status.get(field))}
+            if changed:
+                changes[status_key] = changed
+        return changes
@@ -0,0 +1,96 @@
+"""Recording of timed spans (Tango calls, HTTP requests, event waits, tests) to a Chrome trace file,
+which can be loaded into a trace viewer such as Perfetto (https://ui.perfetto.dev) or chrome://tracing"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import metrics
+
+
+class Tracer:
+    """Collects spans from any thread, each tagged with the test running at the time.
+    Nothing is recorded until the tracer is enabled, so spans cost next to nothing when tracing is off.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._events = []
+        self._thread_names = {}
+        self._pid = os.getpid()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def enable(self):
+        self.enabled = True
+
+    def add_span(self, name: str, category: str, duration_sec: float, end_time: float | None = None, /, **args):
+        """
+        Record a span which has already finished.
+
+        :param name: Name of the span, e.g. "command_inout ConfigureScan"
+        :param category: Category of the span, e.g. "tango"
+        :param duration_sec: Duration in seconds
+        :param end_time: time.perf_counter() at which the span ended; defaults to now
+        :param args: Tags to attach to the span, e.g. the device FQDN and command name. The current test's node ID is added as "test".
+        """
+        if not self.enabled:
+            return
+        if end_time is None:
+            end_time = time.perf_counter()
+        args.setdefault("test", metrics.nodeid)
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (end_time - duration_sec) * 1e6,
+            "dur": duration_sec * 1e6,
+            "pid": self._pid,
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._thread_names.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name: str, category: str, /, **args):
+        """
+        Context manager recording its body as a span.
+
+        :param name: Name of the span
+        :param category: Category of the span
+        :param args: Tags to attach to the span
+        """
+        if not self.enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            end_time = time.perf_counter()
+            self.add_span(name, category, end_time - start_time, end_time, **args)
+
+    def write(self, path: str):
+        """
+        Write every span recorded so far to a Chrome trace (JSON object format) file.
+
+        :param path: Path of the file to write
+        """
+        with self._lock:
+            events = list(self._events)
+            thread_names = dict(self._thread_names)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": thread_name}} for tid, thread_name in thread_names.items()]
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, trace_file)
+
+
+tracer = Tracer()